@@ -1,7 +1,10 @@
+import functools
+import gzip
+import hashlib
 import json
 import os
 from pathlib import Path
-from flask import Flask, jsonify, send_from_directory, redirect, Response, request
+from flask import Flask, jsonify, Response, request
 from engine import (
     build_report,
     save_daily_snapshot,
@@ -24,29 +27,190 @@ from theme_leader import (
     list_theme_leader_snapshots,
 )
 from theme_logic_kr import save_kr_theme_report
+from mimetypes import guess_type
+from werkzeug.http import http_date
+from werkzeug.utils import safe_join
 from pywebpush import WebPushException, webpush
 import threading
 import time
 import uuid
-from datetime import datetime, UTC
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC
 from zoneinfo import ZoneInfo
-import urllib.request
-import urllib.parse
-import urllib.error
+import numpy as np
+import requests
 import yfinance as yf
 
+try:
+    import orjson  # jsonify가 쓰는 stdlib 인코더보다 숫자 페이로드에서 수 배 빠름
+except Exception:
+    orjson = None
+
 app = Flask(__name__, static_folder="public")
+# X-Sendfile을 해석해 주는 프록시(nginx 등) 뒤에서 돌 때만 켠다.
+# 켜면 Flask send_file 계열이 본문 대신 헤더만 쓰고 파일 전송은 커널
+# sendfile(2)로 위임된다. 프록시 없이 켜면 빈 응답이 나가므로 기본 꺼짐.
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
+
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class _OrjsonProvider(JSONProvider):
+        # numpy 스칼라/배열과 비문자열 키도 파이썬 변환 없이 C 경로에서 처리
+        _OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=self._OPTS).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrjsonProvider(app)
+
+# SPA index.html처럼 배포 때만 바뀌는 정적 파일을 요청마다 open+read 하지
+# 않도록 mtime 검증만 하고 메모리 바이트로 바로 내려준다
+_STATIC_CACHE: dict = {}
+_STATIC_CACHE_LOCK = threading.Lock()
+
+
+def _serve_static(dirpath: str, name: str):
+    path = safe_join(dirpath, name)
+    if path is None:
+        return Response(status=404)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return Response(status=404)
+    ent = _STATIC_CACHE.get(path)
+    if ent is None or ent[0] != mtime:
+        try:
+            with open(path, "rb") as fh:
+                body = fh.read()
+        except OSError:
+            return Response(status=404)
+        ent = (mtime, body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', http_date(mtime))
+        with _STATIC_CACHE_LOCK:
+            _STATIC_CACHE[path] = ent
+    _, body, etag, last_mod = ent
+    headers = {'ETag': etag, 'Last-Modified': last_mod, 'Cache-Control': 'public, max-age=60'}
+    if request.headers.get('If-None-Match') == etag or request.headers.get('If-Modified-Since') == last_mod:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype=guess_type(name)[0] or 'application/octet-stream', headers=headers)
+
+
+def _ojson(obj, status: int = 200) -> Response:
+    """핫 엔드포인트용 JSON 응답. jsonify는 provider를 거쳐도 str 왕복이
+    생기므로, 자주 폴링되는 경로는 orjson 바이트를 바로 Response에 태운다."""
+    if orjson is not None:
+        body = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(body, status=status, mimetype="application/json")
+
+
+def _docache(max_age_sec: int):
+    """지난 날짜 스냅샷처럼 사실상 불변인 JSON에 캐시 헤더 + ETag를 붙여
+    재방문 폴링을 304로 끝내는 데코레이터."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            resp = app.make_response(fn(*args, **kwargs))
+            if 200 <= resp.status_code < 300 and not resp.direct_passthrough:
+                resp.headers['Cache-Control'] = f'public, max-age={max_age_sec}'
+                resp.add_etag()
+                return resp.make_conditional(request)
+            return resp
+        return wrapper
+    return deco
+
+
+_GZIP_MIN_SIZE = 1024
+
+
+@app.after_request
+def _gzip_json_response(resp):
+    """1KB 이상 JSON 응답을 gzip으로 압축한다 (flask-compress 의존성 없이).
+
+    300종목 랭킹/분봉 OHLCV처럼 숫자 위주 JSON은 5~10배 줄어든다.
+    /api/report처럼 미리 압축해 둔 응답은 Content-Encoding이 이미 있어
+    그대로 통과한다.
+    """
+    try:
+        if resp.direct_passthrough or resp.status_code < 200 or resp.status_code >= 300:
+            return resp
+        if resp.mimetype != 'application/json' or resp.headers.get('Content-Encoding'):
+            return resp
+        if 'gzip' not in (request.headers.get('Accept-Encoding') or ''):
+            return resp
+        body = resp.get_data()
+        if len(body) < _GZIP_MIN_SIZE:
+            return resp
+        resp.set_data(gzip.compress(body, compresslevel=6))
+        resp.headers['Content-Encoding'] = 'gzip'
+        vary = resp.headers.get('Vary') or ''
+        if 'Accept-Encoding' not in vary:
+            resp.headers['Vary'] = f"{vary}, Accept-Encoding".strip(", ")
+    except Exception:
+        pass
+    return resp
+
+
 KST = ZoneInfo("Asia/Seoul")
 TEMA_WEB_V2_ORIGIN = "http://127.0.0.1:3010"
 
+class _LRUCache:
+    """크기 상한이 있는 LRU 캐시 (조회 시 move_to_end, 초과 시 오래된 것부터 축출).
+
+    값 구조({"ts": …, "data": …})와 TTL 판단은 기존 호출부 그대로 두고,
+    여기서는 무한히 자라던 dict에 상한만 씌운다. _CHART_CACHE 키는
+    symbol|period|interval 조합이라 스캐너 트래픽에 수천 개까지 쌓였었다.
+    """
+
+    def __init__(self, cap: int):
+        self.cap = cap
+        self._d: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            v = self._d.get(key)
+            if v is None:
+                return default
+            self._d.move_to_end(key)
+            return v
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._d[key] = value
+            self._d.move_to_end(key)
+            while len(self._d) > self.cap:
+                self._d.popitem(last=False)
+
+    def items(self):
+        with self._lock:
+            return list(self._d.items())
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+
+
 # lightweight in-memory cache for faster UI response
-_REPORT_CACHE = {}
+_REPORT_CACHE = _LRUCache(cap=24)  # 3 market × 4 limit × 점수설정 여유분
 _REPORT_TTL_SEC = 60
 _REPORT_PROGRESS = {}
-_REPORT_LOCK = threading.Lock()
-_CHART_CACHE = {}
+# 진행률 틱(심볼당 1회)과 HTTP 읽기가 전역 락 하나에서 경쟁하지 않도록
+# 키 해시로 샤딩한 락을 쓴다. 읽기는 락 없이 dict.get으로 가고(CPython에서
+# 원자적), 쓰기는 기존 엔트리를 제자리 수정하는 대신 새 dict를 통째로
+# 게시해서 직렬화 중인 읽기 쪽이 반만 갱신된 상태를 보지 않게 한다.
+_LOCK_STRIPES = [threading.Lock() for _ in range(16)]
+_CHART_CACHE = _LRUCache(cap=512)
 _CHART_TTL_SEC = 300
 
+
+def _key_lock(key: str) -> threading.Lock:
+    return _LOCK_STRIPES[hash(key) & 15]
+
 VAPID_PUBLIC_KEY = "BPl-6O7KJvhPwqLM_P2XVpUgOJ9ojjYMaaHtBPUlz1m--u52HTchETpBES5iZG1zhizz_MLKbOI8Xq53rq-cQ0o"
 VAPID_PRIVATE_KEY = "IOFjthCc8giC_JQRFiDNVh9C6H0-KEGEHbTiHf__6mQ"
 _PUSH_SUBSCRIPTIONS_FILE = os.path.join(os.path.dirname(__file__), "push_subscriptions.json")
@@ -158,12 +322,16 @@ def _notify_push_subscribers(payload: dict) -> None:
             _save_push_subscriptions()
 
 
+_ALLOWED_MARKETS = frozenset({'all', 'kr', 'us'})
+_ALLOWED_LIMITS = frozenset({50, 100, 200, 300})
+
+
 def _normalize_candidate_limit(v) -> int:
     try:
         n = int(v)
     except Exception:
         n = 300
-    return n if n in {50, 100, 200, 300} else 300
+    return n if n in _ALLOWED_LIMITS else 300
 
 
 def _parse_score_config_from_request() -> dict:
@@ -247,28 +415,77 @@ def _report_key(market: str, candidate_limit: int, score_config: dict) -> str:
     return f"{market}:{candidate_limit}:{_score_config_key(score_config)}"
 
 
-def _snapshot_worker():
-    """매일 KST 20:00~20:04 사이 1회 스냅샷 저장."""
-    last_saved_day = None
-    while True:
-        try:
-            now = datetime.now(KST)
-            today = now.strftime("%Y-%m-%d")
-            if now.hour == 20 and now.minute <= 4 and last_saved_day != today:
-                save_daily_snapshot(force=False)
-                last_saved_day = today
-        except Exception:
-            pass
-        time.sleep(60)
+def _parse_report_params() -> tuple[str, int, dict, str]:
+    """report 계열 3개 엔드포인트가 복붙하던 market/limit/scoreConfig 파싱 일원화."""
+    market = (request.args.get('market', default='all', type=str) or 'all').lower()
+    if market not in _ALLOWED_MARKETS:
+        market = 'all'
+    candidate_limit = _normalize_candidate_limit(request.args.get('limit', default=300, type=int))
+    score_config = _parse_score_config_from_request()
+    return market, candidate_limit, score_config, _report_key(market, candidate_limit, score_config)
+
+
+_ISO_KST_CACHE = [0, '']
+
+
+def _iso_now_kst() -> str:
+    """초 단위로 캐시한 KST ISO 타임스탬프. 진행률 틱마다 tz-aware datetime
+    생성 + ISO 포맷을 반복하지 않도록 같은 초 안에서는 문자열을 재사용한다."""
+    t = int(time.time())
+    if t != _ISO_KST_CACHE[0]:
+        _ISO_KST_CACHE[0] = t
+        _ISO_KST_CACHE[1] = datetime.now(KST).isoformat()
+    return _ISO_KST_CACHE[1]
+
+
+def _schedule_next_snapshot():
+    """매일 KST 20:00 1회 스냅샷 저장.
+
+    상주 스레드가 잠들어 있는 대신 다음 20:00까지의 델타로 one-shot Timer를
+    걸고, 발화 후 다시 +24h짜리 Timer를 건다. 저장 실패 시에는 5분 뒤
+    재시도 Timer를 한 번 추가한다.
+    """
+    now = datetime.now(KST)
+    target = now.replace(hour=20, minute=0, second=0, microsecond=0)
+    if now >= target:
+        target += timedelta(days=1)
+    t = threading.Timer(max(1.0, (target - now).total_seconds()), _fire_snapshot)
+    t.daemon = True
+    t.start()
+
+
+def _fire_snapshot():
+    try:
+        save_daily_snapshot(force=False)
+    except Exception:
+        retry = threading.Timer(300.0, _try_snapshot_once)
+        retry.daemon = True
+        retry.start()
+    _schedule_next_snapshot()
+
 
+def _try_snapshot_once():
+    try:
+        save_daily_snapshot(force=False)
+    except Exception:
+        pass
 
-threading.Thread(target=_snapshot_worker, daemon=True).start()
+
+_schedule_next_snapshot()
 
 
 def _run_report_job(key: str, market: str, candidate_limit: int, score_config: dict, task_id: str):
+    # 심볼당 1회 오는 진행률 틱을 200ms당 1회로 묶는다. UI 폴링은 500ms~1s
+    # 주기라 체감 차이는 없고, 락 획득/타임스탬프 포맷이 수십 배 줄어든다.
+    last_pub = [0.0]
+
     def _progress_cb(done: int, total: int, symbol: str):
-        with _REPORT_LOCK:
-            st = _REPORT_PROGRESS.get(key, {})
+        now = time.time()
+        if done < total and now - last_pub[0] < 0.2:
+            return
+        last_pub[0] = now
+        with _key_lock(key):
+            st = dict(_REPORT_PROGRESS.get(key) or {})
             if st.get("taskId") != task_id:
                 return
             st.update({
@@ -277,21 +494,31 @@ def _run_report_job(key: str, market: str, candidate_limit: int, score_config: d
                 "total": total,
                 "symbol": symbol,
                 "progressPct": round((done / total) * 100, 2) if total else 0.0,
-                "updatedAt": datetime.now(KST).isoformat(),
+                "updatedAt": _iso_now_kst(),
             })
             _REPORT_PROGRESS[key] = st
 
     try:
         clear_runtime_caches()
         data = build_report(market=market, candidate_limit=candidate_limit, progress_cb=_progress_cb, score_config=score_config)
-        with _REPORT_LOCK:
-            _REPORT_CACHE[key] = {"ts": time.time(), "data": data}
-            st = _REPORT_PROGRESS.get(key, {})
+        # 응답 바이트는 갱신 시 1회만 직렬화/압축해 두고 요청마다 재사용
+        if orjson is not None:
+            body = orjson.dumps(data)
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        gz = gzip.compress(body, compresslevel=6)
+        # 심볼 상세 조회가 rankings 선형 탐색 대신 O(1) 조회를 하도록
+        # 캐시에 넣을 때 심볼→항목 역색인을 같이 만들어 둔다
+        idx = {str(r.get('symbol', '')).upper(): r for r in (data.get('rankings') or [])}
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        with _key_lock(key):
+            _REPORT_CACHE[key] = {"ts": time.time(), "data": data, "body": body, "gz": gz, "idx": idx, "etag": etag}
+            st = dict(_REPORT_PROGRESS.get(key) or {})
             st.update({
                 "status": "done",
                 "done": st.get("total", 0),
                 "progressPct": 100.0,
-                "updatedAt": datetime.now(KST).isoformat(),
+                "updatedAt": _iso_now_kst(),
                 "error": None,
             })
             _REPORT_PROGRESS[key] = st
@@ -299,49 +526,110 @@ def _run_report_job(key: str, market: str, candidate_limit: int, score_config: d
         if payload:
             _notify_push_subscribers(payload)
     except Exception as e:
-        with _REPORT_LOCK:
-            st = _REPORT_PROGRESS.get(key, {})
+        with _key_lock(key):
+            st = dict(_REPORT_PROGRESS.get(key) or {})
             st.update({
                 "status": "error",
                 "error": str(e),
-                "updatedAt": datetime.now(KST).isoformat(),
+                "updatedAt": _iso_now_kst(),
             })
             _REPORT_PROGRESS[key] = st
 
 
+def _prewarm_report():
+    """부팅 직후 첫 사용자가 404(no_cached_report)를 맞지 않도록 기본
+    리포트(all/300)를 미리 빌드해 둔다. PREWARM=1일 때만 동작."""
+    try:
+        with app.test_request_context('/api/report?market=all&limit=300'):
+            market, candidate_limit, score_config, key = _parse_report_params()
+        task_id = str(uuid.uuid4())
+        _REPORT_PROGRESS[key] = {
+            "taskId": task_id,
+            "status": "running",
+            "done": 0,
+            "total": 0,
+            "symbol": None,
+            "progressPct": 0.0,
+            "startedAt": _iso_now_kst(),
+            "updatedAt": _iso_now_kst(),
+            "error": None,
+        }
+        _run_report_job(key, market, candidate_limit, score_config, task_id)
+    except Exception:
+        pass
+
+
+if os.environ.get('PREWARM') == '1':
+    threading.Thread(target=_prewarm_report, daemon=True).start()
+
+
 @app.get('/api/report')
 def api_report():
-    market = (request.args.get('market', default='all', type=str) or 'all').lower()
-    if market not in {'all', 'kr', 'us'}:
-        market = 'all'
-    candidate_limit = _normalize_candidate_limit(request.args.get('limit', default=300, type=int))
-    score_config = _parse_score_config_from_request()
-    key = _report_key(market, candidate_limit, score_config)
+    market, candidate_limit, score_config, key = _parse_report_params()
 
     st = _REPORT_PROGRESS.get(key)
     if st and st.get("status") == "running":
-        return jsonify({"status": "running", "market": market, "limit": candidate_limit, "progress": st}), 202
+        # 빌드 중에도 직전 보고서가 있으면 알려줘서 클라이언트가 빈 화면 대신
+        # 기존 데이터를 계속 그릴 수 있게 한다
+        prev = _REPORT_CACHE.get(key)
+        prev_data = prev.get('data') if prev else None
+        return _ojson({
+            "status": "running",
+            "market": market,
+            "limit": candidate_limit,
+            "progress": st,
+            "cachedReport": {
+                "available": prev_data is not None,
+                "generatedAt": (prev_data or {}).get("generatedAt"),
+            },
+        }, 202)
 
     cached = _REPORT_CACHE.get(key)
     if cached and cached.get('data') is not None:
-        return jsonify(cached['data'])
-
-    return jsonify({"status": "idle", "market": market, "limit": candidate_limit, "message": "no_cached_report"}), 404
+        # 대시보드 특성상 1분 staleness는 허용: 브라우저/프록시도 같이 캐시하게 한다
+        headers = {'Cache-Control': f'max-age={_REPORT_TTL_SEC}', 'Vary': 'Accept-Encoding'}
+        if st and st.get("status") == "error":
+            # 직전 빌드가 실패해도 500 대신 마지막 성공 보고서를 stale 표시로 제공
+            headers['X-Stale'] = '1'
+        etag = cached.get('etag')
+        if etag:
+            headers['ETag'] = etag
+            # 내용이 안 바뀐 폴링은 본문 없이 304로 끝낸다
+            if request.headers.get('If-None-Match') == etag:
+                return Response(status=304, headers=headers)
+        body = cached.get('body')
+        if body is not None:
+            gz = cached.get('gz')
+            if gz is not None and 'gzip' in (request.headers.get('Accept-Encoding') or ''):
+                headers['Content-Encoding'] = 'gzip'
+                return Response(gz, mimetype='application/json', headers=headers)
+            return Response(body, mimetype='application/json', headers=headers)
+        resp = jsonify(cached['data'])
+        resp.headers['Cache-Control'] = headers['Cache-Control']
+        return resp
+
+    if st and st.get("status") == "error":
+        return _ojson({"status": "error", "market": market, "limit": candidate_limit, "error": st.get("error")}, 502)
+    return _ojson({"status": "idle", "market": market, "limit": candidate_limit, "message": "no_cached_report"}, 404)
 
 
 @app.get('/api/report/refresh')
 def api_report_refresh():
-    market = (request.args.get('market', default='all', type=str) or 'all').lower()
-    if market not in {'all', 'kr', 'us'}:
-        market = 'all'
-    candidate_limit = _normalize_candidate_limit(request.args.get('limit', default=300, type=int))
-    score_config = _parse_score_config_from_request()
-    key = _report_key(market, candidate_limit, score_config)
+    market, candidate_limit, score_config, key = _parse_report_params()
 
-    with _REPORT_LOCK:
+    with _key_lock(key):
         st = _REPORT_PROGRESS.get(key)
         if st and st.get("status") == "running":
-            return jsonify({"status": "running", "market": market, "limit": candidate_limit, "progress": st}), 202
+            # 단일 비행 가드. 단, 업데이트가 오래 끊긴 running 엔트리는 죽은
+            # 빌드로 보고 새 작업을 허용한다 (새 taskId가 이전 콜백을 무효화)
+            stale = False
+            try:
+                upd = datetime.fromisoformat(str(st.get("updatedAt")))
+                stale = (datetime.now(KST) - upd).total_seconds() > 15 * 60
+            except Exception:
+                stale = False
+            if not stale:
+                return jsonify({"status": "running", "market": market, "limit": candidate_limit, "progress": st}), 202
 
         task_id = str(uuid.uuid4())
         _REPORT_PROGRESS[key] = {
@@ -351,8 +639,8 @@ def api_report_refresh():
             "total": 0,
             "symbol": None,
             "progressPct": 0.0,
-            "startedAt": datetime.now(KST).isoformat(),
-            "updatedAt": datetime.now(KST).isoformat(),
+            "startedAt": _iso_now_kst(),
+            "updatedAt": _iso_now_kst(),
             "error": None,
         }
         threading.Thread(target=_run_report_job, args=(key, market, candidate_limit, score_config, task_id), daemon=True).start()
@@ -362,17 +650,19 @@ def api_report_refresh():
 
 @app.get('/api/report/progress')
 def api_report_progress():
-    market = (request.args.get('market', default='all', type=str) or 'all').lower()
-    if market not in {'all', 'kr', 'us'}:
+    # 탭마다 0.5~1초 간격으로 폴링되는 최다 호출 경로라 공용 헬퍼의 튜플
+    # 왕복 없이 필요한 값만 지역변수로 뽑는다
+    a = request.args.get
+    market = (a('market', 'all') or 'all').lower()
+    if market not in _ALLOWED_MARKETS:
         market = 'all'
-    candidate_limit = _normalize_candidate_limit(request.args.get('limit', default=300, type=int))
-    score_config = _parse_score_config_from_request()
-    key = _report_key(market, candidate_limit, score_config)
+    candidate_limit = _normalize_candidate_limit(a('limit', 300))
+    key = _report_key(market, candidate_limit, _parse_score_config_from_request())
 
     st = _REPORT_PROGRESS.get(key)
     if not st:
-        return jsonify({"status": "idle", "market": market, "limit": candidate_limit})
-    return jsonify({"status": st.get("status", "idle"), "market": market, "limit": candidate_limit, "progress": st})
+        return _ojson({"status": "idle", "market": market, "limit": candidate_limit})
+    return _ojson({"status": st.get("status", "idle"), "market": market, "limit": candidate_limit, "progress": st})
 
 
 @app.get('/api/archive')
@@ -422,10 +712,9 @@ def api_universe_update():
     # 시가총액 상위 300 파일 재생성 + 메모리 유니버스 재로드
     data = refresh_universe_top300()
 
-    # 기존 캐시 무효화
-    with _REPORT_LOCK:
-        _REPORT_CACHE.clear()
-        _REPORT_PROGRESS.clear()
+    # 기존 캐시 무효화 (dict.clear는 GIL 하에서 원자적이라 락 불필요)
+    _REPORT_CACHE.clear()
+    _REPORT_PROGRESS.clear()
 
     return jsonify(data)
 
@@ -436,21 +725,20 @@ def api_symbol_detail(symbol: str):
     if not sym:
         return jsonify({"error": "invalid_symbol"}), 400
 
-    # 최신 캐시부터 탐색해 해당 종목 상세 반환
+    # 최신 캐시부터 역색인으로 탐색해 해당 종목 상세 반환
     items = sorted(_REPORT_CACHE.items(), key=lambda kv: kv[1].get('ts', 0), reverse=True)
     for key, cached in items:
-        data = cached.get('data') or {}
-        rankings = data.get('rankings') or []
-        for r in rankings:
-            if str(r.get('symbol', '')).upper() == sym:
-                return jsonify({
-                    "ok": True,
-                    "cacheKey": key,
-                    "market": data.get('market'),
-                    "candidateLimit": data.get('candidateLimit'),
-                    "generatedAt": data.get('generatedAt'),
-                    "item": r,
-                })
+        r = (cached.get('idx') or {}).get(sym)
+        if r is not None:
+            data = cached.get('data') or {}
+            return jsonify({
+                "ok": True,
+                "cacheKey": key,
+                "market": data.get('market'),
+                "candidateLimit": data.get('candidateLimit'),
+                "generatedAt": data.get('generatedAt'),
+                "item": r,
+            })
 
     return jsonify({"ok": False, "error": "not_found_in_cache", "symbol": sym}), 404
 
@@ -466,16 +754,19 @@ def api_snapshot_force():
 
 
 @app.get('/api/snapshots')
+@_docache(60)
 def api_snapshots():
     return jsonify({"items": list_snapshots(limit=365)})
 
 
 @app.get('/api/snapshots/month/<ym>')
+@_docache(60 * 60 * 24)
 def api_snapshots_by_month(ym: str):
     return jsonify({"month": ym, "dates": list_snapshot_dates_by_month(ym)})
 
 
 @app.get('/api/snapshots/<date_kst>')
+@_docache(60 * 60 * 24)
 def api_snapshot_by_date(date_kst: str):
     data = get_snapshot(date_kst)
     if not data:
@@ -491,34 +782,68 @@ def api_snapshot_performance(date_kst: str):
     return jsonify(data)
 
 
+# UI 폴링은 거의 항상 같은 (limit, pick) 조합이라 리포트를 60초 메모한다.
+# 값은 엔진 캐시들과 같은 {"ts":…, "data":…} 꼴.
+_THEME_LEADER_CACHE: dict = {}
+_THEME_LEADER_TTL_SEC = 60
+
+
+@functools.lru_cache(maxsize=256)
+def _clamp_leader_args(limit_raw: str | None, pick_raw: str | None) -> tuple:
+    """원시 쿼리 문자열을 클램프된 (limit, pick)으로. 반복 폴링은 같은
+    문자열 조합이라 int 변환/클램프가 lru_cache 조회로 끝난다."""
+    try:
+        limit = int(limit_raw) if limit_raw else 12
+    except ValueError:
+        limit = 12
+    try:
+        pick = int(pick_raw) if pick_raw else 2
+    except ValueError:
+        pick = 2
+    return (max(3, min(limit, 30)), max(1, min(pick, 5)))
+
+
+def _theme_leader_cached(limit: int, pick: int) -> dict:
+    key = (limit, pick)
+    hit = _THEME_LEADER_CACHE.get(key)
+    if hit and (time.time() - hit["ts"]) < _THEME_LEADER_TTL_SEC:
+        return hit["data"]
+    data = build_theme_leader_report(limit_themes=limit, per_theme_pick=pick)
+    _THEME_LEADER_CACHE[key] = {"ts": time.time(), "data": data}
+    return data
+
+
 @app.get('/api/theme-leaders')
 def api_theme_leaders():
-    limit = request.args.get('limit', default=12, type=int) or 12
-    pick = request.args.get('pick', default=2, type=int) or 2
+    limit, pick = _clamp_leader_args(request.args.get('limit'), request.args.get('pick'))
     try:
-        return jsonify(build_theme_leader_report(limit_themes=max(3, min(limit, 30)), per_theme_pick=max(1, min(pick, 5))))
+        return jsonify(_theme_leader_cached(limit, pick))
     except Exception as e:
         return jsonify({"error": "theme_leader_unavailable", "message": str(e)}), 502
 
 
 @app.get('/api/theme-leaders/save')
 def api_theme_leaders_save():
-    limit = request.args.get('limit', default=12, type=int) or 12
-    pick = request.args.get('pick', default=2, type=int) or 2
+    limit, pick = _clamp_leader_args(request.args.get('limit'), request.args.get('pick'))
     force = str(request.args.get('force', '0')).lower() in {'1', 'true', 'yes', 'y'}
     try:
-        return jsonify(save_theme_leader_snapshot(force=force, limit_themes=max(3, min(limit, 30)), per_theme_pick=max(1, min(pick, 5))))
+        out = save_theme_leader_snapshot(force=force, limit_themes=limit, per_theme_pick=pick)
+        # 저장은 항상 새로 빌드하므로 이미 낡아진 메모는 버린다
+        _THEME_LEADER_CACHE.pop((limit, pick), None)
+        return jsonify(out)
     except Exception as e:
         return jsonify({"error": "theme_leader_save_failed", "message": str(e)}), 502
 
 
 @app.get('/api/theme-leaders/snapshots')
+@_docache(60)
 def api_theme_leaders_snapshots():
     limit = request.args.get('limit', default=60, type=int) or 60
     return jsonify({"items": list_theme_leader_snapshots(limit=max(1, min(limit, 365)))})
 
 
 @app.get('/api/theme-leaders/snapshots/<date>')
+@_docache(60 * 60 * 24)
 def api_theme_leaders_snapshot_by_date(date: str):
     data = get_theme_leader_snapshot(date)
     if not data:
@@ -526,9 +851,8 @@ def api_theme_leaders_snapshot_by_date(date: str):
     return jsonify(data)
 
 
-@app.get('/')
-def home():
-    return """
+# 허브 HTML은 고정 문자열이므로 요청마다 UTF-8 인코딩하지 않게 바이트로 1회 준비
+_HOME_HTML_BYTES = """
     <html><body style='font-family:Arial;padding:24px;background:#0b1220;color:#e5e7eb'>
       <h2>legendbarber Web Hub</h2>
       <p>이 주소를 앞으로 모든 웹서버의 메인 허브로 사용합니다.</p>
@@ -557,102 +881,197 @@ def home():
         <li><a style='color:#93c5fd' href='/game-one-line-shift'>/game-one-line-shift</a> (독창 퍼즐: 한 줄만 바꾸기)</li>
       </ul>
     </body></html>
-    """
-
-
-@app.get('/invest-recommend')
-def invest_recommend_page():
-    return send_from_directory(app.static_folder, 'index.html')
-
-
-@app.get('/invest-recommend/archive')
-def invest_archive_page():
-    return send_from_directory(app.static_folder, 'archive.html')
-
+    """.encode("utf-8")
 
-@app.get('/invest-recommend-us')
-def invest_recommend_us_page():
-    return redirect('/invest-recommend?market=us', code=302)
 
+_HOME_HTML_GZ = gzip.compress(_HOME_HTML_BYTES, 6)
+_HOME_HTML_ETAG = f'"{hashlib.md5(_HOME_HTML_BYTES).hexdigest()}"'
 
-@app.get('/invest-recommend-kr')
-def invest_recommend_kr_page():
-    return redirect('/invest-recommend?market=kr', code=302)
-
-
-@app.get('/invest-recommend/history')
-def invest_history_page():
-    return send_from_directory(f"{app.static_folder}/invest-history", 'index.html')
 
+@app.get('/')
+def home():
+    # 고정 바이트라 ETag/gzip 본문도 임포트 시 1회 준비. 재방문은 본문 없이 304로 끝낸다
+    if request.headers.get('If-None-Match') == _HOME_HTML_ETAG:
+        return Response(status=304, headers={'ETag': _HOME_HTML_ETAG, 'Cache-Control': 'public, max-age=300'})
+    headers = {'ETag': _HOME_HTML_ETAG, 'Cache-Control': 'public, max-age=300', 'Vary': 'Accept-Encoding'}
+    if 'gzip' in (request.headers.get('Accept-Encoding') or ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(_HOME_HTML_GZ, mimetype='text/html', headers=headers)
+    return Response(_HOME_HTML_BYTES, mimetype='text/html', headers=headers)
+
+
+# 고정 파일 하나를 내려주기만 하는 페이지 라우트는 뷰 함수를 복붙하는 대신
+# 테이블 + add_url_rule 루프로 등록한다 (페이지 추가 = 테이블 한 줄).
+# url_map 항목 수는 그대로지만 뷰 함수 ~15개 분량의 중복 코드가 사라진다.
+_PAGE_RULES = [
+    ('/invest-recommend', 'invest_recommend_page', '', 'index.html'),
+    ('/invest-recommand', 'invest_recommand_alias', '', 'index.html'),  # 오타 경로 호환
+    ('/invest-recommend/archive', 'invest_archive_page', '', 'archive.html'),
+    ('/invest-recommend/history', 'invest_history_page', 'invest-history', 'index.html'),
+    ('/invest-recommend/calendar', 'invest_calendar_page_nested', 'invest-history', 'index.html'),
+    ('/invest-history', 'invest_history_root_page', 'invest-history', 'index.html'),
+    ('/invest-recommend/ui-candidates', 'invest_ui_candidates_index', 'ui-candidates', 'index.html'),
+    ('/invest-recommend/sw-notify.js', 'invest_sw_notify_js', '', 'sw-notify.js'),
+    ('/theme-leaders', 'theme_leaders_page', '', 'theme-leaders.html'),
+    ('/theme-leaders/calendar', 'theme_leaders_calendar_page', '', 'theme-leaders-calendar.html'),
+    ('/theme-now', 'theme_now_page', '', 'theme-now.html'),
+    ('/theme-now-kr', 'theme_now_kr_page', '', 'theme-now-kr.html'),
+]
+
+# 디렉터리 자산(<path:filename>) 라우트도 같은 방식으로 묶는다
+_ASSET_RULES = [
+    ('/invest-recommend/history/<path:filename>', 'invest_history_assets', 'invest-history'),
+    ('/invest-recommend/calendar/<path:filename>', 'invest_calendar_assets_nested', 'invest-history'),
+    ('/invest-history/<path:filename>', 'invest_history_root_assets', 'invest-history'),
+]
+
+
+def _register_page_rules():
+    for rule, endpoint, subdir, fname in _PAGE_RULES:
+        dirpath = f"{app.static_folder}/{subdir}" if subdir else app.static_folder
+        app.add_url_rule(rule, endpoint=endpoint, view_func=(lambda d=dirpath, f=fname: _serve_static(d, f)))
+    for rule, endpoint, subdir in _ASSET_RULES:
+        dirpath = f"{app.static_folder}/{subdir}"
+        app.add_url_rule(rule, endpoint=endpoint, view_func=(lambda filename, d=dirpath: _serve_static(d, filename)))
+
+
+_register_page_rules()
+
+
+# 본문 없이 redirect()만 하던 별칭 라우트는 redirect_to로 등록해서
+# werkzeug 라우팅 단계에서 바로 끝낸다 (뷰 함수 디스패치 생략)
+_REDIRECT_RULES = (
+    ('/invest-recommend-us', 'invest_recommend_us_page', '/invest-recommend?market=us'),
+    ('/invest-recommend-kr', 'invest_recommend_kr_page', '/invest-recommend?market=kr'),
+    ('/calendar', 'invest_calendar_page', '/invest-recommend/calendar'),
+    ('/calendar/<path:filename>', 'invest_calendar_assets', '/invest-recommend/calendar/%(filename)s'),
+)
 
-@app.get('/invest-recommend/history/<path:filename>')
-def invest_history_assets(filename):
-    return send_from_directory(f"{app.static_folder}/invest-history", filename)
+for _rule, _endpoint, _dst in _REDIRECT_RULES:
+    app.add_url_rule(_rule, endpoint=_endpoint, redirect_to=_dst)
+del _rule, _endpoint, _dst
 
 
 @app.get('/invest-recommend/symbol/<symbol>')
 def invest_symbol_detail_page(symbol: str):
-    return send_from_directory(app.static_folder, 'symbol-detail.html')
+    return _serve_static(app.static_folder, 'symbol-detail.html')
 
 
-@app.get('/invest-recommend/ui-candidates')
-def invest_ui_candidates_index():
-    return send_from_directory(f"{app.static_folder}/ui-candidates", 'index.html')
+_UI_CANDIDATES_DIR = f"{app.static_folder}/ui-candidates"
 
 
 @app.get('/invest-recommend/ui-candidates/<name>')
 def invest_ui_candidates_page(name: str):
     fname = f"{name}.html" if not name.endswith('.html') else name
-    return send_from_directory(f"{app.static_folder}/ui-candidates", fname)
-
-
-@app.get('/invest-recommend/sw-notify.js')
-def invest_sw_notify_js():
-    return send_from_directory(app.static_folder, 'sw-notify.js')
-
-
-@app.get('/theme-leaders')
-def theme_leaders_page():
-    return send_from_directory(app.static_folder, 'theme-leaders.html')
+    return _serve_static(_UI_CANDIDATES_DIR, fname)
 
 
 @app.get('/theme-leaders/<date>')
 def theme_leaders_page_by_date(date: str):
     # 하위 URL 파싱: /theme-leaders/260219 형태
-    return send_from_directory(app.static_folder, 'theme-leaders.html')
-
-
-@app.get('/theme-leaders/calendar')
-def theme_leaders_calendar_page():
-    return send_from_directory(app.static_folder, 'theme-leaders-calendar.html')
+    return _serve_static(app.static_folder, 'theme-leaders.html')
 
 
-@app.get('/theme-now')
-def theme_now_page():
-    return send_from_directory(app.static_folder, 'theme-now.html')
-
-
-@app.get('/theme-now-kr')
-def theme_now_kr_page():
-    return send_from_directory(app.static_folder, 'theme-now-kr.html')
+# KR 테마 리포트 빌드는 수십 초짜리 무거운 작업이라 동시 클릭이
+# 동일 작업을 중복 실행하지 않도록 single-flight로 묶고, 성공 결과는
+# 30초간 메모해 빌드 직후의 재클릭이 작업을 다시 돌리지 않게 한다
+_KR_REFRESH_LOCK = threading.Lock()
+_KR_REFRESH_STATE = {"ev": None, "result": None, "ts": 0.0}
+_KR_REFRESH_TTL_SEC = 30
 
 
 @app.get('/api/theme-now-kr/refresh')
 def api_theme_now_kr_refresh():
+    with _KR_REFRESH_LOCK:
+        res = _KR_REFRESH_STATE.get("result")
+        if res is not None and res[1] == 200 and (time.time() - _KR_REFRESH_STATE["ts"]) < _KR_REFRESH_TTL_SEC:
+            return jsonify(res[0]), res[1]
+        ev = _KR_REFRESH_STATE.get("ev")
+        leader = ev is None
+        if leader:
+            ev = threading.Event()
+            _KR_REFRESH_STATE["ev"] = ev
+
+    if not leader:
+        # 진행 중인 빌드를 기다렸다가 같은 결과를 돌려준다
+        ev.wait(timeout=120)
+        res = _KR_REFRESH_STATE.get("result")
+        if res is not None:
+            return jsonify(res[0]), res[1]
+        return jsonify({"ok": False, "message": "refresh_timeout"}), 504
+
     try:
         data = save_kr_theme_report()
-        return jsonify({"ok": True, "generatedAt": data.get("generatedAt")})
+        result = ({"ok": True, "generatedAt": data.get("generatedAt")}, 200)
     except Exception as e:
-        return jsonify({"ok": False, "message": str(e)}), 500
+        result = ({"ok": False, "message": str(e)}, 500)
+    with _KR_REFRESH_LOCK:
+        _KR_REFRESH_STATE["result"] = result
+        _KR_REFRESH_STATE["ts"] = time.time()
+        _KR_REFRESH_STATE["ev"] = None
+    ev.set()
+    return jsonify(result[0]), result[1]
+
+
+# 실패 응답도 잠깐 기억해 두는 네거티브 캐시 + 동일 키 동시 요청을 업스트림
+# 1회로 합치는 single-flight 맵. 없는 심볼을 반복 조회하는 스캐너가
+# 매번 1~3초짜리 야후 왕복을 유발하던 것을 TTL당 1회로 줄인다.
+_CHART_NEG_CACHE = _LRUCache(cap=256)
+_CHART_NEG_TTL_SEC = 60
+_CHART_INFLIGHT: dict = {}
+_CHART_INFLIGHT_LOCK = threading.Lock()
 
 
 def _fetch_chart_data(symbol: str, period: str = "6mo", interval: str = "1d", force_refresh: bool = False) -> tuple[dict, int]:
     key = f"{symbol}|{period}|{interval}"
     now = time.time()
-    cached = _CHART_CACHE.get(key)
-    if (not force_refresh) and cached and (now - cached.get("ts", 0) <= _CHART_TTL_SEC):
-        return cached["data"], 200
+    if not force_refresh:
+        cached = _CHART_CACHE.get(key)
+        if cached and (now - cached.get("ts", 0) <= _CHART_TTL_SEC):
+            return cached["data"], 200
+        neg = _CHART_NEG_CACHE.get(key)
+        if neg and (now - neg.get("ts", 0) <= _CHART_NEG_TTL_SEC):
+            return neg["data"], neg["status"]
+
+    with _CHART_INFLIGHT_LOCK:
+        ev = _CHART_INFLIGHT.get(key)
+        leader = ev is None
+        if leader:
+            ev = threading.Event()
+            _CHART_INFLIGHT[key] = ev
+
+    if not leader:
+        # 다른 요청이 같은 키를 받아오는 중이면 기다렸다가 캐시를 다시 본다
+        ev.wait(timeout=30)
+        cached = _CHART_CACHE.get(key)
+        if cached and (time.time() - cached.get("ts", 0) <= _CHART_TTL_SEC):
+            return cached["data"], 200
+        neg = _CHART_NEG_CACHE.get(key)
+        if neg and (time.time() - neg.get("ts", 0) <= _CHART_NEG_TTL_SEC):
+            return neg["data"], neg["status"]
+        return {"ok": False, "message": "upstream_timeout", "symbol": symbol}, 504
 
+    try:
+        data, status = _fetch_chart_from_yf(symbol, period, interval)
+        now = time.time()
+        if status == 200:
+            # 직렬화 바이트/ETag도 같이 캐시해서 폴링 응답이 재직렬화를 건너뛰게
+            if orjson is not None:
+                chart_body = orjson.dumps(data)
+            else:
+                chart_body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = f'"{hashlib.blake2b(chart_body, digest_size=8).hexdigest()}"'
+            _CHART_CACHE[key] = {"ts": now, "data": data, "body": chart_body, "etag": etag}
+        else:
+            _CHART_NEG_CACHE[key] = {"ts": now, "data": data, "status": status}
+        return data, status
+    finally:
+        with _CHART_INFLIGHT_LOCK:
+            _CHART_INFLIGHT.pop(key, None)
+        ev.set()
+
+
+def _fetch_chart_from_yf(symbol: str, period: str, interval: str) -> tuple[dict, int]:
     try:
         hist = yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=True)
         if hist is None or hist.empty:
@@ -675,12 +1094,15 @@ def _fetch_chart_data(symbol: str, period: str = "6mo", interval: str = "1d", fo
         if ohlcv.empty:
             return {"ok": False, "message": "no_ohlc", "symbol": symbol}, 404
 
-        labels = [idx.strftime('%Y-%m-%d') for idx in ohlcv.index]
-        open_ = [round(float(v), 4) for v in ohlcv['Open'].tolist()]
-        high = [round(float(v), 4) for v in ohlcv['High'].tolist()]
-        low = [round(float(v), 4) for v in ohlcv['Low'].tolist()]
-        close = [round(float(v), 4) for v in ohlcv['Close'].tolist()]
-        volume = [int(float(v)) for v in ohlcv['Volume'].fillna(0).tolist()] if 'Volume' in ohlcv else []
+        # 파이썬 루프(원소당 float+round 호출)를 컬럼 단위 NumPy 연산으로 교체.
+        # 분봉처럼 행이 수만 개여도 round/변환이 C 레벨에서 한 번에 끝난다.
+        labels = ohlcv.index.strftime('%Y-%m-%d').tolist()
+        arr = np.round(ohlcv[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64), 4)
+        open_ = arr[:, 0].tolist()
+        high = arr[:, 1].tolist()
+        low = arr[:, 2].tolist()
+        close = arr[:, 3].tolist()
+        volume = ohlcv['Volume'].fillna(0).to_numpy(dtype=np.int64).tolist() if 'Volume' in ohlcv else []
 
         data = {
             "ok": True,
@@ -694,7 +1116,6 @@ def _fetch_chart_data(symbol: str, period: str = "6mo", interval: str = "1d", fo
             "close": close,
             "volume": volume,
         }
-        _CHART_CACHE[key] = {"ts": now, "data": data}
         return data, 200
     except Exception as e:
         return {"ok": False, "message": str(e), "symbol": symbol}, 500
@@ -706,7 +1127,14 @@ def api_chart_symbol(symbol: str):
     interval = request.args.get('interval', default='1d', type=str) or '1d'
     force_refresh = str(request.args.get('refresh', '0')).lower() in {'1', 'true', 'yes', 'y'}
     data, status = _fetch_chart_data(symbol, period, interval, force_refresh)
-    return jsonify(data), status
+    if status == 200:
+        ent = _CHART_CACHE.get(f"{symbol}|{period}|{interval}")
+        if ent and ent.get('body') is not None and ent.get('data') is data:
+            headers = {'ETag': ent['etag'], 'Cache-Control': 'public, max-age=60'}
+            if request.headers.get('If-None-Match') == ent['etag']:
+                return Response(status=304, headers=headers)
+            return Response(ent['body'], mimetype='application/json', headers=headers)
+    return _ojson(data, status)
 
 
 @app.post('/api/archive')
@@ -716,7 +1144,7 @@ def api_archive_save():
     if not symbol:
         return jsonify({'ok': False, 'error': 'invalid_symbol'}), 400
     market = (str(payload.get('market') or 'all') or 'all').lower()
-    if market not in {'all', 'kr', 'us'}:
+    if market not in _ALLOWED_MARKETS:
         market = 'all'
     candidate_limit = _normalize_candidate_limit(payload.get('limit', 300))
     score_config = payload.get('scoreConfig') if isinstance(payload.get('scoreConfig'), dict) else {'preset': 'default_6_4'}
@@ -797,39 +1225,29 @@ def api_archive_chart_refresh(symbol: str):
     return jsonify({'ok': chart.get('ok', False), 'chart': chart, 'chartPeriod': period, 'chartInterval': interval}), status
 
 
-# invest-recommend 하위 캘린더 경로
-@app.get('/invest-recommend/calendar')
-def invest_calendar_page_nested():
-    return send_from_directory(f"{app.static_folder}/invest-history", 'index.html')
-
-
-@app.get('/invest-recommend/calendar/<path:filename>')
-def invest_calendar_assets_nested(filename):
-    return send_from_directory(f"{app.static_folder}/invest-history", filename)
-
-
-# 기존 경로 호환
-@app.get('/invest-history')
-def invest_history_root_page():
-    return send_from_directory(f"{app.static_folder}/invest-history", 'index.html')
-
-
-@app.get('/invest-history/<path:filename>')
-def invest_history_root_assets(filename):
-    return send_from_directory(f"{app.static_folder}/invest-history", filename)
-
+# backward compatibility
+# 요청마다 urllib로 새 TCP 연결을 여는 대신 keep-alive 풀을 공유한다.
+# SPA가 자산 수십 개를 한꺼번에 끌어가므로 핸드셰이크 절감 폭이 크다.
+_TEMA_SESSION = requests.Session()
+_TEMA_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=64, max_retries=0))
 
-@app.get('/calendar')
-def invest_calendar_page():
-    return redirect('/invest-recommend/calendar', code=302)
+# 프록시 경로에서 요청마다 재생성할 필요 없는 상수들
+_PROXY_BODY_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+_PROXY_DEFAULT_UA = "Mozilla/5.0"
 
 
-@app.get('/calendar/<path:filename>')
-def invest_calendar_assets(filename):
-    return redirect(f'/invest-recommend/calendar/{filename}', code=302)
+# SPA index.html은 배포 때만 바뀌므로 같은 업스트림 본문에 대한 재작성
+# 결과를 메모한다 (bytes 키 lru_cache — 본문이 바뀌면 키도 바뀐다)
+@functools.lru_cache(maxsize=8)
+def _rewrite_base_href(body_bytes: bytes) -> bytes:
+    if b'base href="/tema-web-v2/"' not in body_bytes:
+        idx = body_bytes.find(b'<head>')
+        if idx >= 0:
+            idx += len(b'<head>')
+            return body_bytes[:idx] + b'<base href="/tema-web-v2/">' + body_bytes[idx:]
+    return body_bytes
 
 
-# backward compatibility
 def _proxy_to_tema_v2(subpath: str = ""):
     target = f"{TEMA_WEB_V2_ORIGIN}/{subpath.lstrip('/')}"
     qs = request.query_string.decode('utf-8', errors='ignore')
@@ -837,33 +1255,35 @@ def _proxy_to_tema_v2(subpath: str = ""):
         target = f"{target}?{qs}"
 
     method = request.method.upper()
-    body = request.get_data() if method in {"POST", "PUT", "PATCH", "DELETE"} else None
+    body = request.get_data() if method in _PROXY_BODY_METHODS else None
 
-    headers = {"User-Agent": request.headers.get("User-Agent", "Mozilla/5.0")}
+    headers = {"User-Agent": request.headers.get("User-Agent", _PROXY_DEFAULT_UA)}
     ct = request.headers.get("Content-Type")
     if ct:
         headers["Content-Type"] = ct
 
-    req = urllib.request.Request(target, data=body, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            body_bytes = resp.read()
-            content_type = resp.headers.get("Content-Type", "text/html; charset=utf-8")
-            out = Response(body_bytes, status=resp.status, content_type=content_type)
-            # subpath deploy를 위한 base href 주입 (html에만)
-            if "text/html" in content_type.lower():
-                text = body_bytes.decode('utf-8', errors='ignore')
-                if '<head>' in text and 'base href="/tema-web-v2/"' not in text:
-                    text = text.replace('<head>', '<head><base href="/tema-web-v2/">', 1)
-                out = Response(text, status=resp.status, content_type=content_type)
-
-            # tema-web-v2는 캐시 고정으로 인한 갱신 문제를 피하기 위해 no-store 강제
+        resp = _TEMA_SESSION.request(method, target, data=body, headers=headers, timeout=30, stream=True)
+        content_type = resp.headers.get("Content-Type", "text/html; charset=utf-8")
+
+        # base href 주입이 필요 없는 비-HTML(번들 JS/이미지 등)은 전체를
+        # 메모리에 쌓지 않고 64KB 청크로 그대로 흘려보낸다
+        if "text/html" not in content_type.lower():
+            out = Response(resp.iter_content(chunk_size=65536), status=resp.status_code, content_type=content_type)
             out.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
             out.headers["Pragma"] = "no-cache"
             out.headers["Expires"] = "0"
             return out
-    except urllib.error.HTTPError as e:
-        return Response(e.read(), status=e.code, content_type=e.headers.get("Content-Type", "text/plain"))
+
+        # subpath deploy를 위한 base href 주입 (html에만).
+        # 바이트 수준 재작성이고 동일 본문은 lru_cache가 스캔/조립을 건너뛴다
+        out = Response(_rewrite_base_href(resp.content), status=resp.status_code, content_type=content_type)
+
+        # tema-web-v2는 캐시 고정으로 인한 갱신 문제를 피하기 위해 no-store 강제
+        out.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+        out.headers["Pragma"] = "no-cache"
+        out.headers["Expires"] = "0"
+        return out
     except Exception as e:
         return Response(f"temaWeb-v2 backend unavailable: {e}", status=502, content_type="text/plain; charset=utf-8")
 
@@ -878,100 +1298,43 @@ def tema_web_v2_subpath(subpath: str):
     return _proxy_to_tema_v2(subpath)
 
 
-@app.get('/invest-recommand')
-def invest_recommand_alias():
-    return send_from_directory(app.static_folder, 'index.html')
-
-
-@app.get('/game-demo')
-def game_demo_redirect():
-    return redirect('/game-demo/', code=302)
-
-
-@app.get('/game-demo/')
-def game_demo_page():
-    return send_from_directory(f"{app.static_folder}/game-demo", 'index.html')
-
-
-@app.get('/game-demo/<path:filename>')
-def game_demo_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-demo", filename)
-
-
-@app.get('/game-demo-v2')
-def game_demo_v2_redirect():
-    return redirect('/game-demo-v2/', code=302)
-
+# 게임마다 redirect/page/assets 3개 핸들러를 복붙하던 것을 allowlist 기반
+# 동적 라우트 3개로 통합 (게임 추가 시 GAMES에 이름만 넣으면 됨).
+# allowlist 검사는 핸들러의 if문 대신 werkzeug any() 컨버터로 라우팅 단계에서 끝낸다.
+GAMES = {
+    "game-demo",
+    "game-demo-v2",
+    "game-foldlight",
+    "game-tap-lights",
+    "game-tap-burst",
+    "game-one-line-shift",
+}
 
-@app.get('/game-demo-v2/')
-def game_demo_v2_page():
-    return send_from_directory(f"{app.static_folder}/game-demo-v2", 'index.html')
+_GAME_CONV = "any(" + ", ".join(f'"{g}"' for g in sorted(GAMES)) + "):game"
+# 요청마다 f-string으로 디렉터리 경로를 다시 조립하지 않게 임포트 시 1회 계산
+_GAME_DIRS = {g: f"{app.static_folder}/{g}" for g in GAMES}
 
 
-@app.get('/game-demo-v2/<path:filename>')
-def game_demo_v2_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-demo-v2", filename)
+app.add_url_rule(f'/<{_GAME_CONV}>', endpoint='game_redirect', redirect_to='/%(game)s/')
 
 
-@app.get('/game-foldlight')
-def game_foldlight_redirect():
-    return redirect('/game-foldlight/', code=302)
+@app.get(f'/<{_GAME_CONV}>/')
+def game_page(game: str):
+    return _serve_static(_GAME_DIRS[game], 'index.html')
 
 
-@app.get('/game-foldlight/')
-def game_foldlight_page():
-    return send_from_directory(f"{app.static_folder}/game-foldlight", 'index.html')
-
-
-@app.get('/game-foldlight/<path:filename>')
-def game_foldlight_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-foldlight", filename)
-
-
-@app.get('/game-tap-lights')
-def game_tap_lights_redirect():
-    return redirect('/game-tap-lights/', code=302)
-
-
-@app.get('/game-tap-lights/')
-def game_tap_lights_page():
-    return send_from_directory(f"{app.static_folder}/game-tap-lights", 'index.html')
-
-
-@app.get('/game-tap-lights/<path:filename>')
-def game_tap_lights_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-tap-lights", filename)
-
-
-@app.get('/game-tap-burst')
-def game_tap_burst_redirect():
-    return redirect('/game-tap-burst/', code=302)
-
-
-@app.get('/game-tap-burst/')
-def game_tap_burst_page():
-    return send_from_directory(f"{app.static_folder}/game-tap-burst", 'index.html')
-
-
-@app.get('/game-tap-burst/<path:filename>')
-def game_tap_burst_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-tap-burst", filename)
-
-
-@app.get('/game-one-line-shift')
-def game_one_line_shift_redirect():
-    return redirect('/game-one-line-shift/', code=302)
-
-
-@app.get('/game-one-line-shift/')
-def game_one_line_shift_page():
-    return send_from_directory(f"{app.static_folder}/game-one-line-shift", 'index.html')
-
-
-@app.get('/game-one-line-shift/<path:filename>')
-def game_one_line_shift_assets(filename):
-    return send_from_directory(f"{app.static_folder}/game-one-line-shift", filename)
+@app.get(f'/<{_GAME_CONV}>/<path:filename>')
+def game_assets(game: str, filename):
+    return _serve_static(_GAME_DIRS[game], filename)
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=3000, debug=False)
+    # werkzeug 개발 서버 대신 운영급 WSGI 서버로 띄운다. gunicorn은 Windows
+    # 미지원이라(py.exe로 구동하는 환경) waitress를 쓰고, 없으면 threaded
+    # 개발 서버로 폴백 — threaded=False면 느린 /api 빌드 하나가 정적 자산
+    # 응답까지 막는다.
+    try:
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=3000, threads=16)
+    except ImportError:
+        app.run(host='0.0.0.0', port=3000, debug=False, threaded=True)
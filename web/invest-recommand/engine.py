@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import concurrent.futures
+import functools
 import json
 import re
+import sqlite3
 import threading
 import time
 import urllib.parse
-import urllib.request
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, UTC, timedelta
 from pathlib import Path
@@ -14,10 +17,87 @@ from zoneinfo import ZoneInfo
 
 import numpy as np
 import pandas as pd
+import requests
 import yfinance as yf
 
+# finance.naver.com / consensus.hankyung.com 등 동일 호스트 반복 요청에서
+# keep-alive 재사용으로 매 호출 TCP+TLS 핸드셰이크를 제거.
+# 테마 상세 수집이 스레드풀 10개로 나가므로 풀 크기를 그에 맞춰 키운다.
+# 일시적 5xx/연결 오류는 어댑터 수준에서 백오프 재시도(수집 루프가 심볼
+# 하나 실패로 구멍 나는 것을 줄인다).
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_retry = requests.adapters.Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_retry)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+del _adapter, _retry
+
+# 호출마다 re 캐시 조회를 타지 않도록 핫패스 패턴은 모듈 로드 시 1회 컴파일
+_CHARSET_RE = re.compile(r"charset\s*=\s*['\"]?([a-z0-9\-]+)")
+_TAG_RE = re.compile(r"<[^>]+>")
+_KR_SYMBOL_RE = re.compile(r"^(\d{6})\.(KS|KQ)$")
+_THEME_LINK_RE = re.compile(r'href="(/sise/sise_group_detail\.naver\?type=theme&no=\d+)"')
+_THEME_LINK_OLD_RE = re.compile(r'href="(/sise/theme_detail\.naver\?no=\d+)"')
+_THEME_TITLE_RE = re.compile(r'<strong class="info_title">\s*([^<]+?)\s*</strong>')
+_THEME_SUBTITLE_RE = re.compile(r'<h3 class="sub_tlt">\s*([^<]+?)\s*</h3>')
+_THEME_STOCK_RE = re.compile(r'item/main\.naver\?code=(\d{6})[^>]*>([^<]+)</a>')
+_DATE_YMD_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_MONTH_YM_RE = re.compile(r"^\d{4}-\d{2}$")
+_KR_ROW_CODE_RE = re.compile(r"item/main\.naver\?code=(\d{6})")
+_RSS_ITEM_RE = re.compile(r"<item>(.*?)</item>", re.S)
+_RSS_TITLE_RE = re.compile(r"<title><!\[CDATA\[(.*?)\]\]></title>")
+_RSS_LINK_RE = re.compile(r"<link>(.*?)</link>")
+_US_ROW_RE = re.compile(r'<tr>.*?<div class="company-name">(.*?)</div>.*?<div class="company-code">.*?([A-Z\.\-]{1,12})</div>.*?<td class="td-right" data-sort="([0-9]+)"><span class="currency-symbol-left">\$</span>.*?</td>', re.S)
+_TR_RE = re.compile(r"<tr[^>]*>.*?</tr>", re.S)
+_TR_CAP_RE = re.compile(r"<tr[^>]*>(.*?)</tr>", re.S)
+_TD_RE = re.compile(r"<td[^>]*>(.*?)</td>", re.S)
+_KR_ROW_NAME_RE = re.compile(r'class="tltle">(.*?)</a>', re.S)
+_NUXT_DECL_RE = re.compile(r"window\.__NUXT__=\(function\((.*?)\)\{return", re.S)
+_NUXT_CALL_RE = re.compile(r"\}\((.*)\)\);</script>", re.S)
+_NUM_TOK_RE = re.compile(r"^[0-9.]+$")
+_PAREN_RE = re.compile(r"\(.*?\)")
+_CONS_DATE_RE = re.compile(r'class="first txt_number">\s*(\d{4}-\d{2}-\d{2})\s*</td>')
+_CONS_TITLE_RE = re.compile(r'class="text_l">[\s\S]*?<a [^>]*>(.*?)</a>')
+_CONS_RIDX_RE = re.compile(r"/analysis/downpdf\?report_idx=(\d+)")
+_PRICE_NUM_RE = re.compile(r"([0-9][0-9,]{3,})")
+_TP_RES = (
+    re.compile(r"목표\s*주가\s*[:：]?\s*([0-9][0-9,]{3,})\s*원", re.I),
+    re.compile(r"적정\s*주가\s*[:：]?\s*([0-9][0-9,]{3,})\s*원", re.I),
+    re.compile(r"\bTP\s*[:=]?\s*([0-9][0-9,]{3,})\b", re.I),
+)
+# NUXT 스크립트에서 뽑는 필드 3개는 고정이라 패턴도 필드별로 미리 컴파일
+_HK_FIELD_RES = {
+    fld: re.compile(rf"{fld}:([a-zA-Z_][a-zA-Z0-9_]*|\"[^\"]*\"|'[^']*'|[0-9\.]+)")
+    for fld in ("TARGET_STOCK_PRICES", "GRADE_VALUE", "OLD_TARGET_STOCK_PRICES")
+}
+
+try:
+    from selectolax.parser import HTMLParser as _HTMLParser  # optional: C 기반 HTML 파서
+except Exception:
+    _HTMLParser = None
+
+try:
+    import orjson  # 숫자 위주 보고서 직렬화가 stdlib json보다 수 배 빠름
+except Exception:
+    orjson = None
+
+
+def _dump_json_bytes(obj: Any) -> bytes:
+    """파일 저장용 JSON 직렬화. orjson이 있으면 그쪽을 태운다 (동일한 indent=2)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _utc_now_z() -> str:
+    # isoformat() 후 "+00:00"을 "Z"로 치환하던 문자열 2회 할당을 strftime 1회로
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-@dataclass
+
+# slots=True로 인스턴스당 __dict__를 없애고(유니버스 600개 × 세 필드),
+# frozen=True로 로드 후 불변임을 강제한다
+@dataclass(slots=True, frozen=True)
 class Asset:
     symbol: str
     name: str
@@ -49,17 +129,33 @@ DEFAULT_UNIVERSE = [
 ]
 
 
+# 유니버스 파일은 갱신 때만 바뀌므로 mtime이 같으면 재파싱을 생략한다
+# (reload_universe는 갱신/통계 경로에서 반복 호출된다)
+_UNIVERSE_FILE_CACHE: Dict[str, object] = {"stamp": None, "assets": None}
+
+
 def _load_universe_from_files() -> List[Asset]:
     base = Path(__file__).resolve().parent
     us_path = base / "universe_us_top300.json"
     kr_path = base / "universe_kr_top300.json"
 
+    def _mtime(p: Path) -> float:
+        try:
+            return p.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    stamp = (_mtime(us_path), _mtime(kr_path))
+    if _UNIVERSE_FILE_CACHE["stamp"] == stamp and _UNIVERSE_FILE_CACHE["assets"] is not None:
+        return _UNIVERSE_FILE_CACHE["assets"]
+
     items: List[Asset] = []
     try:
         for p in [us_path, kr_path]:
             if not p.exists():
                 continue
-            arr = json.loads(p.read_text(encoding="utf-8"))
+            raw = p.read_bytes()
+            arr = orjson.loads(raw) if orjson is not None else json.loads(raw)
             for r in arr:
                 sym = str(r.get("symbol", "")).strip().upper()
                 name = str(r.get("name", "")).strip()
@@ -75,7 +171,11 @@ def _load_universe_from_files() -> List[Asset]:
     for a in items:
         uniq[a.symbol] = a
     out = list(uniq.values())
-    return out if out else DEFAULT_UNIVERSE
+    if not out:
+        return DEFAULT_UNIVERSE
+    _UNIVERSE_FILE_CACHE["stamp"] = stamp
+    _UNIVERSE_FILE_CACHE["assets"] = out
+    return out
 
 
 UNIVERSE = _load_universe_from_files()
@@ -100,7 +200,7 @@ def _save_archive(data: Dict[str, Dict]) -> None:
     try:
         with _ARCHIVE_LOCK:
             ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            ARCHIVE_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            ARCHIVE_PATH.write_bytes(_dump_json_bytes(data))
     except Exception:
         pass
 
@@ -122,9 +222,9 @@ def save_archive_entry(entry: Dict) -> bool:
 def reload_universe() -> Dict:
     global UNIVERSE
     UNIVERSE = _load_universe_from_files()
-    us_n = sum(1 for a in UNIVERSE if a.category == "us-stock")
-    kr_n = sum(1 for a in UNIVERSE if a.category == "kr-stock")
-    return {"total": len(UNIVERSE), "us": us_n, "kr": kr_n}
+    # 카테고리별 집계는 2회 순회 대신 Counter 1-pass로
+    c = Counter(a.category for a in UNIVERSE)
+    return {"total": len(UNIVERSE), "us": c["us-stock"], "kr": c["kr-stock"]}
 
 
 def _fix_mojibake_kr(text: str) -> str:
@@ -165,7 +265,7 @@ def _decode_html_with_fallback(raw: bytes, hinted_encoding: str = "utf-8") -> st
 
     try:
         head = raw[:4096].decode("ascii", "ignore").lower()
-        m = re.search(r"charset\s*=\s*['\"]?([a-z0-9\-]+)", head)
+        m = _CHARSET_RE.search(head)
         if m:
             encs.append(m.group(1))
     except Exception:
@@ -201,21 +301,106 @@ def _decode_html_with_fallback(raw: bytes, hinted_encoding: str = "utf-8") -> st
     return max(candidates, key=_score)
 
 
-def _fetch_text(url: str, encoding: str = "utf-8") -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    raw = urllib.request.urlopen(req, timeout=20).read()
+def _read_capped(resp, max_bytes: int) -> bytes:
+    """응답 본문을 max_bytes까지만 스트리밍으로 읽는다.
+
+    스크레이프 대상 페이지는 수백 KB 수준이라 상한에 걸리지 않지만,
+    트래커 스크립트가 잔뜩 붙은 비정상적으로 큰 응답이 와도 대역폭과
+    파싱 시간이 상한으로 묶인다.
+    """
+    buf = bytearray()
+    try:
+        for chunk in resp.iter_content(chunk_size=16384):
+            buf += chunk
+            if len(buf) >= max_bytes:
+                break
+    finally:
+        resp.close()
+    return bytes(buf)
+
+
+_FETCH_MAX_BYTES = 2_000_000
+
+
+def _fetch_text(url: str, encoding: str = "utf-8", max_bytes: int = _FETCH_MAX_BYTES) -> str:
+    resp = _SESSION.get(url, timeout=20, stream=True)
+    try:
+        # urlopen 시절처럼 403/404는 에러 페이지 본문 대신 예외로 올린다
+        resp.raise_for_status()
+    except Exception:
+        resp.close()
+        raise
+    raw = _read_capped(resp, max_bytes)
     return _decode_html_with_fallback(raw, hinted_encoding=encoding)
 
 
+def _fetch_pages(urls: List[str], encoding: str, workers: int = 8) -> List[str]:
+    """페이지 목록을 스레드풀로 동시에 받아 순서대로 돌려준다.
+
+    순차 루프였던 유니버스 갱신의 체감시간이 Σ(왕복)에서 max(왕복)으로
+    줄어든다. 같은 호스트 동시 연결은 세션 풀 크기 안에서 묶인다.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(urls) or 1)) as ex:
+        return list(ex.map(lambda u: _fetch_text(u, encoding), urls))
+
+
+def _parse_us_marketcap_fast(html: str) -> List[tuple] | None:
+    """selectolax가 설치돼 있으면 companiesmarketcap 표를 C 파서로 추출한다.
+
+    반환은 (심볼, 이름, 시총 달러) 리스트. 파서가 없거나 실패하면 None을
+    돌려주고 호출부의 정규식 경로가 그대로 동작한다.
+    """
+    if _HTMLParser is None:
+        return None
+    try:
+        tree = _HTMLParser(html)
+        out: List[tuple] = []
+        for tr in tree.css("tr"):
+            name_n = tr.css_first("div.company-name")
+            code_n = tr.css_first("div.company-code")
+            if name_n is None or code_n is None:
+                continue
+            # 시총 컬럼은 $ 기호 스팬이 붙은 data-sort 셀 (가격 컬럼과 구분)
+            cap_n = None
+            for td in tr.css("td.td-right[data-sort]"):
+                if td.css_first("span.currency-symbol-left") is not None:
+                    cap_n = td
+                    break
+            if cap_n is None:
+                continue
+            name = _WS_RE.sub(" ", name_n.text() or "").strip()
+            symbol = (code_n.text(strip=True) or "").strip().upper()
+            try:
+                mcap = int(cap_n.attributes.get("data-sort") or "")
+            except Exception:
+                continue
+            if name and symbol:
+                out.append((symbol, name, mcap))
+        return out
+    except Exception:
+        return None
+
+
+def _parse_us_marketcap(html: str) -> List[tuple]:
+    """시총 페이지 1장에서 (심볼, 이름, 시총 달러) 행을 추출한다."""
+    fast = _parse_us_marketcap_fast(html)
+    if fast is not None:
+        return fast
+
+    out: List[tuple] = []
+    for m in _US_ROW_RE.finditer(html):
+        name = _WS_RE.sub(" ", m.group(1)).strip()
+        symbol = m.group(2).strip().upper()
+        mcap = int(m.group(3))
+        out.append((symbol, name, mcap))
+    return out
+
+
 def _refresh_us_top300(base_dir: Path) -> int:
     rows = []
-    for page in range(1, 5):
-        html = _fetch_text(f"https://companiesmarketcap.com/usa/largest-companies-in-the-usa-by-market-cap/?page={page}", "utf-8")
-        for m in re.finditer(r'<tr>.*?<div class="company-name">(.*?)</div>.*?<div class="company-code">.*?([A-Z\.\-]{1,12})</div>.*?<td class="td-right" data-sort="([0-9]+)"><span class="currency-symbol-left">\$</span>.*?</td>', html, re.S):
-            name = re.sub(r"\s+", " ", m.group(1)).strip()
-            symbol = m.group(2).strip().upper()
-            mcap = int(m.group(3))
-            rows.append((symbol, name, mcap))
+    urls = [f"https://companiesmarketcap.com/usa/largest-companies-in-the-usa-by-market-cap/?page={page}" for page in range(1, 5)]
+    for html in _fetch_pages(urls, "utf-8"):
+        rows.extend(_parse_us_marketcap(html))
 
     best = {}
     for s, n, c in rows:
@@ -224,58 +409,96 @@ def _refresh_us_top300(base_dir: Path) -> int:
 
     arr = sorted([(s, v[0], v[1]) for s, v in best.items()], key=lambda x: x[2], reverse=True)[:300]
     out = [{"symbol": s, "name": n, "category": "us-stock", "marketCap": c} for s, n, c in arr]
-    (base_dir / "universe_us_top300.json").write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+    if not out:
+        # 스크랩이 차단/변경돼 0행이면 기존 유니버스 파일을 덮어쓰지 않는다
+        raise RuntimeError("us_top300_parse_empty")
+    (base_dir / "universe_us_top300.json").write_bytes(_dump_json_bytes(out))
     return len(out)
 
 
 def _strip_tags(x: str) -> str:
-    x = re.sub(r"<[^>]+>", "", x)
+    x = _TAG_RE.sub("", x)
     return x.replace("&nbsp;", " ").replace(",", "").strip()
 
 
-def _refresh_kr_top300(base_dir: Path) -> int:
-    rows = []
-    for page in range(1, 9):
-        html = _fetch_text(f"https://finance.naver.com/sise/sise_market_sum.naver?sosok=0&page={page}", "euc-kr")
-        for tr in re.findall(r"<tr[^>]*>.*?</tr>", html, re.S):
-            if "item/main.naver?code=" not in tr:
+_WS_RE = re.compile(r"\s+")
+
+
+def _txt(x: str) -> str:
+    """태그를 공백으로 바꾸고 연속 공백을 하나로 접은 평문을 돌려준다."""
+    return _WS_RE.sub(" ", _TAG_RE.sub(" ", x)).strip()
+
+
+def _parse_kr_market_sum_fast(html: str) -> List[tuple] | None:
+    """selectolax가 설치돼 있으면 시가총액 테이블 행을 C 파서 1-pass로 추출한다.
+
+    반환은 (종목코드, 이름, 시총 억원) 리스트. 파서가 없거나 실패하면 None을
+    돌려주고 호출부의 정규식 경로가 그대로 동작한다.
+    """
+    if _HTMLParser is None:
+        return None
+    try:
+        tree = _HTMLParser(html)
+        out: List[tuple] = []
+        for tr in tree.css("table tr"):
+            a = tr.css_first('a[href*="item/main.naver?code="]')
+            if a is None:
                 continue
-            code_m = re.search(r"item/main\.naver\?code=(\d{6})", tr)
-            name_m = re.search(r'class="tltle">(.*?)</a>', tr, re.S)
-            if not code_m or not name_m:
+            m = _KR_ROW_CODE_RE.search(a.attributes.get("href") or "")
+            if not m:
                 continue
-            code = code_m.group(1)
-            name = _strip_tags(name_m.group(1))
-            tds = re.findall(r"<td[^>]*>(.*?)</td>", tr, re.S)
-            cols = [_strip_tags(td) for td in tds]
-            if len(cols) < 7:
+            name = (a.text(strip=True) or "").strip()
+            cols = [(td.text(strip=True) or "").replace(",", "") for td in tr.css("td")]
+            if not name or len(cols) < 7:
                 continue
             try:
                 mcap_eok = float(cols[6])
             except Exception:
                 continue
+            out.append((m.group(1), name, mcap_eok))
+        return out
+    except Exception:
+        return None
+
+
+def _parse_kr_market_sum(html: str) -> List[tuple]:
+    """시가총액 페이지 1장에서 (종목코드, 이름, 시총 억원) 행을 추출한다."""
+    fast = _parse_kr_market_sum_fast(html)
+    if fast is not None:
+        return fast
+
+    out: List[tuple] = []
+    for tr in _TR_RE.findall(html):
+        if "item/main.naver?code=" not in tr:
+            continue
+        code_m = _KR_ROW_CODE_RE.search(tr)
+        name_m = _KR_ROW_NAME_RE.search(tr)
+        if not code_m or not name_m:
+            continue
+        name = _strip_tags(name_m.group(1))
+        tds = _TD_RE.findall(tr)
+        cols = [_strip_tags(td) for td in tds]
+        if len(cols) < 7:
+            continue
+        try:
+            mcap_eok = float(cols[6])
+        except Exception:
+            continue
+        out.append((code_m.group(1), name, mcap_eok))
+    return out
+
+
+def _refresh_kr_top300(base_dir: Path) -> int:
+    rows = []
+    kospi_urls = [f"https://finance.naver.com/sise/sise_market_sum.naver?sosok=0&page={page}" for page in range(1, 9)]
+    for html in _fetch_pages(kospi_urls, "euc-kr"):
+        for code, name, mcap_eok in _parse_kr_market_sum(html):
             rows.append((code + ".KS", name, int(mcap_eok * 100000000)))
 
     if len(rows) < 300:
-        for page in range(1, 13):
-            html = _fetch_text(f"https://finance.naver.com/sise/sise_market_sum.naver?sosok=1&page={page}", "euc-kr")
-            for tr in re.findall(r"<tr[^>]*>.*?</tr>", html, re.S):
-                if "item/main.naver?code=" not in tr:
-                    continue
-                code_m = re.search(r"item/main\.naver\?code=(\d{6})", tr)
-                name_m = re.search(r'class="tltle">(.*?)</a>', tr, re.S)
-                if not code_m or not name_m:
-                    continue
-                code = code_m.group(1)
-                name = _strip_tags(name_m.group(1))
-                tds = re.findall(r"<td[^>]*>(.*?)</td>", tr, re.S)
-                cols = [_strip_tags(td) for td in tds]
-                if len(cols) < 7:
-                    continue
-                try:
-                    mcap_eok = float(cols[6])
-                except Exception:
-                    continue
+        kosdaq_urls = [f"https://finance.naver.com/sise/sise_market_sum.naver?sosok=1&page={page}" for page in range(1, 13)]
+        for html in _fetch_pages(kosdaq_urls, "euc-kr"):
+            for code, name, mcap_eok in _parse_kr_market_sum(html):
                 rows.append((code + ".KQ", name, int(mcap_eok * 100000000)))
 
     best = {}
@@ -285,20 +508,31 @@ def _refresh_kr_top300(base_dir: Path) -> int:
 
     arr = sorted([(s, v[0], v[1]) for s, v in best.items()], key=lambda x: x[2], reverse=True)[:300]
     out = [{"symbol": s, "name": n, "category": "kr-stock", "marketCap": c} for s, n, c in arr]
-    (base_dir / "universe_kr_top300.json").write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+    if not out:
+        # 스크랩이 차단/변경돼 0행이면 기존 유니버스 파일을 덮어쓰지 않는다
+        raise RuntimeError("kr_top300_parse_empty")
+    (base_dir / "universe_kr_top300.json").write_bytes(_dump_json_bytes(out))
     return len(out)
 
 
 def refresh_universe_top300() -> Dict:
     base = Path(__file__).resolve().parent
-    us_n = _refresh_us_top300(base)
-    kr_n = _refresh_kr_top300(base)
+    # US/KR 갱신은 서로 다른 호스트를 긁는 독립 작업이라 병렬로 돌려
+    # 전체 소요시간을 둘 중 느린 쪽 하나로 줄인다
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+        f_us = ex.submit(_refresh_us_top300, base)
+        f_kr = ex.submit(_refresh_kr_top300, base)
+        us_n = f_us.result()
+        kr_n = f_kr.result()
     loaded = reload_universe()
-    return {"ok": True, "us": us_n, "kr": kr_n, "loaded": loaded, "updatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z")}
+    return {"ok": True, "us": us_n, "kr": kr_n, "loaded": loaded, "updatedAt": _utc_now_z()}
 
 
 def clear_runtime_caches() -> None:
+    _CLOSE_CACHE.clear()
     _CONS_CACHE.clear()
+    _NEWS_CACHE.clear()
+    _INFO_CACHE.clear()
     _HK_REPORT_CACHE.clear()
     _THEME_META_CACHE.clear()
     _NAVER_THEME_CACHE["ts"] = 0.0
@@ -312,8 +546,8 @@ def get_universe_stats() -> Dict:
     return {
         "loaded": reload_universe(),
         "files": {
-            "us": {"path": str(us_path), "exists": us_path.exists(), "updatedAt": datetime.fromtimestamp(us_path.stat().st_mtime, UTC).isoformat().replace("+00:00", "Z") if us_path.exists() else None},
-            "kr": {"path": str(kr_path), "exists": kr_path.exists(), "updatedAt": datetime.fromtimestamp(kr_path.stat().st_mtime, UTC).isoformat().replace("+00:00", "Z") if kr_path.exists() else None},
+            "us": {"path": str(us_path), "exists": us_path.exists(), "updatedAt": datetime.fromtimestamp(us_path.stat().st_mtime, UTC).strftime("%Y-%m-%dT%H:%M:%SZ") if us_path.exists() else None},
+            "kr": {"path": str(kr_path), "exists": kr_path.exists(), "updatedAt": datetime.fromtimestamp(kr_path.stat().st_mtime, UTC).strftime("%Y-%m-%dT%H:%M:%SZ") if kr_path.exists() else None},
         },
     }
 
@@ -322,49 +556,267 @@ SNAPSHOT_DIR = Path(__file__).resolve().parent / "snapshots"
 KST = ZoneInfo("Asia/Seoul")
 POSITIVE = ["beat", "strong", "upgrade", "rally", "surge", "record", "gain"]
 NEGATIVE = ["miss", "downgrade", "drop", "fall", "weak", "risk", "lawsuit"]
+
+try:
+    import ahocorasick  # optional: 설치돼 있으면 헤드라인을 1-pass로 스캔
+except Exception:
+    ahocorasick = None
+
+
+def _build_sentiment_automaton():
+    if ahocorasick is None:
+        return None
+    a = ahocorasick.Automaton()
+    for w in POSITIVE:
+        a.add_word(w, (w, 1))
+    for w in NEGATIVE:
+        a.add_word(w, (w, -1))
+    a.make_automaton()
+    return a
+
+
+_SENTIMENT_AC = _build_sentiment_automaton()
+
+# 자동자가 없을 때도 키워드별 `in` 스윕 대신 단일 교대 정규식 1-pass로 스캔.
+# 긴 키워드 우선 배치로 짧은 접두어가 매치를 가로채지 않게 한다.
+_SENTIMENT_WEIGHTS = {w: 1 for w in POSITIVE} | {w: -1 for w in NEGATIVE}
+_SENTIMENT_RE = re.compile("|".join(sorted(map(re.escape, _SENTIMENT_WEIGHTS), key=len, reverse=True)))
+
+
+def _headline_tone(text: str) -> int:
+    """키워드당 존재 여부(±1)로 tone 집계. 어느 경로든 한 번의 스캔으로 처리."""
+    found: Dict[str, int] = {}
+    if _SENTIMENT_AC is not None:
+        for _, (word, weight) in _SENTIMENT_AC.iter(text):
+            found[word] = weight
+    else:
+        for m in _SENTIMENT_RE.finditer(text):
+            w = m.group(0)
+            found[w] = _SENTIMENT_WEIGHTS[w]
+    return sum(found.values())
 _THEME_META_CACHE: Dict[str, Dict] = {}
 _HK_REPORT_CACHE: Dict[str, Dict] = {}
 _NAVER_THEME_CACHE: Dict[str, object] = {"ts": 0.0, "map": {}}
 
+# 평가 워커 12개가 같은 캐시 딕셔너리에 동시에 쓰므로 쓰기만 락으로 감싼다.
+# 읽기는 락 없이 두는데, 엔트리가 통째로 교체되는 구조라 낡은 값을 읽어도
+# 다시 받아오는 것 이상의 문제가 없다.
+_CACHE_WRITE_LOCK = threading.Lock()
+
+
+_CLOSE_CACHE: Dict[str, Dict] = {}
+_CLOSE_TTL_SEC = 60 * 15  # 일봉 기준이라 15분 내 재요청은 네트워크 생략
+_BATCH_CHUNK_SIZE = 50  # yf.download 1회당 심볼 수 (요청 크기/부분 실패 격리)
+
 
 def _download_close(symbol: str, period: str = "1y") -> pd.Series | None:
+    key = f"{symbol}|{period}"
+    now = time.time()
+    cached = _CLOSE_CACHE.get(key)
+    if cached and (now - cached.get("ts", 0) < _CLOSE_TTL_SEC):
+        return cached["data"]
+
+    s: pd.Series | None
     try:
         df = yf.Ticker(symbol).history(period=period, auto_adjust=True)
         if df is None or df.empty or "Close" not in df:
-            return None
-        s = df["Close"].dropna()
-        if len(s) < 80:
-            return None
-        return s
+            s = None
+        else:
+            c = df["Close"].dropna()
+            s = c if len(c) >= 80 else None
     except Exception:
-        return None
+        s = None
 
+    with _CACHE_WRITE_LOCK:
+        _CLOSE_CACHE[key] = {"ts": now, "data": s}
+    return s
 
-def _pct(s: pd.Series, d: int) -> float:
-    if len(s) <= d:
-        return 0.0
-    return float(s.iloc[-1] / s.iloc[-d - 1] - 1)
 
+def _download_close_batch(symbols: List[str], period: str = "1y") -> Dict[str, pd.Series]:
+    """유니버스 전체 종가를 yf.download 1회로 일괄 수집 (종목별 순차 요청 제거)."""
+    out: Dict[str, pd.Series] = {}
+    if not symbols:
+        return out
 
-def _vol(s: pd.Series) -> float:
-    r = s.pct_change().dropna()
-    return float(r.std() * np.sqrt(252)) if len(r) > 20 else 0.0
+    # TTL 이내 캐시는 재사용하고 누락분만 내려받는다
+    now = time.time()
+    missing: List[str] = []
+    for sym in symbols:
+        cached = _CLOSE_CACHE.get(f"{sym}|{period}")
+        if cached and (now - cached.get("ts", 0) < _CLOSE_TTL_SEC):
+            if cached["data"] is not None:
+                out[sym] = cached["data"]
+        else:
+            missing.append(sym)
 
+    if not missing:
+        return out
 
-def _mdd(s: pd.Series) -> float:
-    arr = s.values
+    # 300종목급 유니버스를 한 방에 요청하면 응답 한 건이 너무 커지고
+    # 일부 실패가 전체 실패로 번지므로 적당한 크기로 나눠서 내려받는다
+    for i in range(0, len(missing), _BATCH_CHUNK_SIZE):
+        chunk = missing[i:i + _BATCH_CHUNK_SIZE]
+        try:
+            data = yf.download(tickers=chunk, period=period, auto_adjust=True, group_by="ticker", threads=True, progress=False)
+        except Exception:
+            continue
+        if data is None or data.empty:
+            continue
+
+        if isinstance(data.columns, pd.MultiIndex):
+            for sym in chunk:
+                try:
+                    if sym in data.columns.get_level_values(0):
+                        s = data[sym]["Close"].dropna()
+                        if len(s) >= 80:
+                            out[sym] = s
+                            _CLOSE_CACHE[f"{sym}|{period}"] = {"ts": now, "data": s}
+                except Exception:
+                    continue
+        elif "Close" in data and len(chunk) == 1:
+            s = data["Close"].dropna()
+            if len(s) >= 80:
+                out[chunk[0]] = s
+                _CLOSE_CACHE[f"{chunk[0]}|{period}"] = {"ts": now, "data": s}
+
+    return out
+
+
+def _to_arr(s: pd.Series) -> np.ndarray:
+    """점수 함수들이 공유할 종가 ndarray. 평가 1회당 변환도 1회로 묶는다."""
+    return np.ascontiguousarray(s.to_numpy(dtype=np.float64))
+
+
+def _vol_mdd_kernel(arr: np.ndarray) -> tuple[float, float]:
+    """연환산 변동성과 최대낙폭을 ndarray 1개로 함께 계산하는 수치 커널."""
+    if arr.shape[0] > 21:
+        r = arr[1:] / arr[:-1] - 1.0
+        vol = float(r.std(ddof=1) * np.sqrt(252))
+    else:
+        vol = 0.0
     peak = np.maximum.accumulate(arr)
-    dd = arr / peak - 1
-    return float(dd.min())
+    mdd = float((arr / peak - 1.0).min())
+    return vol, mdd
 
 
 _CONS_CACHE: Dict[str, Dict] = {}
 _CONS_TTL_SEC = 60 * 60 * 6  # 6h
 
+# 컨센서스/테마 메타는 프로세스 재시작마다 유니버스 전체를 다시 긁게 하지
+# 않도록 작은 sqlite KV에도 남긴다. WAL 모드라 읽기가 쓰기에 막히지 않는다.
+_DISK_CACHE_PATH = Path(__file__).resolve().parent / "engine_cache.sqlite3"
+_DISK_CACHE_LOCK = threading.Lock()
+_DISK_CACHE_CONN: sqlite3.Connection | None = None
+_THEME_META_DISK_TTL_SEC = 60 * 60 * 24 * 7  # 섹터/업종은 거의 안 바뀐다
+
 
-def _safe_fetch_text(url: str, encoding: str = "utf-8") -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    raw = urllib.request.urlopen(req, timeout=2.5).read()
+def _disk_cache() -> sqlite3.Connection | None:
+    global _DISK_CACHE_CONN
+    with _DISK_CACHE_LOCK:
+        if _DISK_CACHE_CONN is None:
+            try:
+                conn = sqlite3.connect(str(_DISK_CACHE_PATH), check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS kv ("
+                    "ns TEXT NOT NULL, key TEXT NOT NULL, ts REAL NOT NULL, data BLOB NOT NULL, "
+                    "PRIMARY KEY (ns, key))"
+                )
+                _DISK_CACHE_CONN = conn
+            except Exception:
+                return None
+        return _DISK_CACHE_CONN
+
+
+def _disk_cache_get(ns: str, key: str, ttl_sec: float) -> Dict | None:
+    conn = _disk_cache()
+    if conn is None:
+        return None
+    try:
+        with _DISK_CACHE_LOCK:
+            row = conn.execute("SELECT ts, data FROM kv WHERE ns=? AND key=?", (ns, key)).fetchone()
+        if not row or (time.time() - row[0]) >= ttl_sec:
+            return None
+        return orjson.loads(row[1]) if orjson is not None else json.loads(row[1])
+    except Exception:
+        return None
+
+
+def _disk_cache_put(ns: str, key: str, data: Dict) -> None:
+    conn = _disk_cache()
+    if conn is None:
+        return
+    try:
+        blob = orjson.dumps(data) if orjson is not None else json.dumps(data, ensure_ascii=False).encode("utf-8")
+        with _DISK_CACHE_LOCK:
+            conn.execute("INSERT OR REPLACE INTO kv (ns, key, ts, data) VALUES (?, ?, ?, ?)", (ns, key, time.time(), blob))
+    except Exception:
+        pass
+
+# yf.Ticker().info는 호출 한 번에 내부 HTTP 여러 번을 유발하므로
+# 같은 보고서 빌드 안에서 종목당 한 번만 받아오도록 짧게 캐시한다
+_INFO_CACHE: Dict[str, Dict] = {}
+_INFO_TTL_SEC = 60 * 60
+
+
+def _ticker_info(symbol: str) -> Dict:
+    now = time.time()
+    cached = _INFO_CACHE.get(symbol)
+    if cached and (now - cached.get("ts", 0) < _INFO_TTL_SEC):
+        return cached["data"]
+    try:
+        data = yf.Ticker(symbol).info or {}
+    except Exception:
+        data = {}
+    with _CACHE_WRITE_LOCK:
+        _INFO_CACHE[symbol] = {"ts": now, "data": data}
+    return data
+
+
+def _prefetch_infos(symbols: List[str]) -> None:
+    """유니버스 .info를 한꺼번에 받아 _INFO_CACHE를 미리 덥힌다.
+
+    yfinance가 Tickers.download_info(내부 스레드풀)를 제공하면 그걸 쓰고,
+    없는 버전이면 우리 스레드풀로 _ticker_info를 병렬 호출한다.
+    """
+    now = time.time()
+    missing = []
+    for sym in symbols:
+        cached = _INFO_CACHE.get(sym)
+        if not (cached and (now - cached.get("ts", 0) < _INFO_TTL_SEC)):
+            missing.append(sym)
+    if not missing:
+        return
+
+    try:
+        tk = yf.Tickers(" ".join(missing))
+        if hasattr(tk, "download_info"):
+            tk.download_info()
+            tickers = tk.tickers if isinstance(tk.tickers, dict) else {}
+            for sym in missing:
+                try:
+                    t = tickers.get(sym.upper())
+                    info = (t.info or {}) if t is not None else {}
+                except Exception:
+                    info = {}
+                with _CACHE_WRITE_LOCK:
+                    _INFO_CACHE[sym] = {"ts": now, "data": info}
+            return
+    except Exception:
+        pass
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as ex:
+        list(ex.map(_ticker_info, missing))
+
+
+def _safe_fetch_text(url: str, encoding: str = "utf-8", max_bytes: int = _FETCH_MAX_BYTES) -> str:
+    resp = _SESSION.get(url, timeout=2.5, stream=True)
+    try:
+        resp.raise_for_status()
+    except Exception:
+        resp.close()
+        raise
+    raw = _read_capped(resp, max_bytes)
     return _decode_html_with_fallback(raw, hinted_encoding=encoding)
 
 
@@ -436,24 +888,29 @@ def _hankyung_view_fields(report_idx: str) -> Dict:
     out: Dict = {}
     try:
         html = _safe_fetch_text(f"https://markets.hankyung.com/consensus/view/{rid}", encoding="utf-8")
-        m_decl = re.search(r"window\.__NUXT__=\(function\((.*?)\)\{return", html, re.S)
-        m_call = re.search(r"\}\((.*)\)\);</script>", html, re.S)
+        # 필요한 값은 전부 NUXT 스크립트 안에 있으므로 str.find로 그 구간만 잘라
+        # 이후 정규식들이 문서 전체를 다시 훑지 않게 한다
+        nuxt_at = html.find("window.__NUXT__")
+        region = html[nuxt_at:] if nuxt_at >= 0 else html
+        m_decl = _NUXT_DECL_RE.search(region)
+        m_call = _NUXT_CALL_RE.search(region)
         if not m_decl or not m_call:
-            _HK_REPORT_CACHE[rid] = out
+            with _CACHE_WRITE_LOCK:
+                _HK_REPORT_CACHE[rid] = out
             return out
 
         names = [x.strip() for x in m_decl.group(1).split(",")]
         vals = _split_js_args(m_call.group(1))
 
-        for fld in ["TARGET_STOCK_PRICES", "GRADE_VALUE", "OLD_TARGET_STOCK_PRICES"]:
-            m_f = re.search(rf"{fld}:([a-zA-Z_][a-zA-Z0-9_]*|\"[^\"]*\"|'[^']*'|[0-9\.]+)", html)
+        for fld, fld_re in _HK_FIELD_RES.items():
+            m_f = fld_re.search(region)
             if not m_f:
                 continue
             tok = m_f.group(1)
             if tok and tok[0] in {'"', "'"}:
                 out[fld] = _js_atom(tok)
                 continue
-            if re.match(r"^[0-9.]+$", tok):
+            if _NUM_TOK_RE.match(tok):
                 out[fld] = _js_atom(tok)
                 continue
             if tok in names:
@@ -463,7 +920,8 @@ def _hankyung_view_fields(report_idx: str) -> Dict:
     except Exception:
         out = {}
 
-    _HK_REPORT_CACHE[rid] = out
+    with _CACHE_WRITE_LOCK:
+        _HK_REPORT_CACHE[rid] = out
     return out
 
 
@@ -515,13 +973,18 @@ def _recommendation_bucket(rec: str | None) -> str | None:
     return None
 
 
+# 투자의견 키워드. 한글은 대소문자 개념이 없으므로 정규식 re.I 대신
+# 소문자화한 본문에 대한 substring 검사로 충분하다 (영문만 lower 필요)
+_REC_KEYWORDS = [(kw, kw.lower()) for kw in ["매수", "중립", "보유", "매도", "BUY", "HOLD", "SELL", "Outperform", "Underperform", "Neutral"]]
+
+
 def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
     """KR 종목은 한경 컨센서스 리포트 목록을 우선 사용해 컨센서스 점수를 계산한다.
     - 최근 1개월 기업 리포트만 사용
     - 동일 증권사 중복 제거
     - 목표가(텍스트 추출 가능 시) + 투자의견 분포 + 표본수 + 최신도 반영
     """
-    code_match = re.match(r"^(\d{6})\.(KS|KQ)$", symbol or "")
+    code_match = _KR_SYMBOL_RE.match(symbol or "")
     if not code_match:
         return {
             "targetMeanPrice": None,
@@ -539,11 +1002,11 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
     stock_name = (name or "").strip()
     if not stock_name:
         try:
-            info = yf.Ticker(symbol).info or {}
+            info = _ticker_info(symbol)
             stock_name = str(info.get("shortName") or info.get("longName") or "").strip()
         except Exception:
             stock_name = ""
-    stock_name = re.sub(r"\(.*?\)", "", stock_name).strip()
+    stock_name = _PAREN_RE.sub("", stock_name).strip()
 
     if not stock_name:
         return {
@@ -578,10 +1041,6 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
         # 한경 컨센서스 목록은 UTF-8 기준으로 파싱(한글 깨짐 방지)
         html = _safe_fetch_text(url, encoding="utf-8")
 
-        def _txt(x: str) -> str:
-            x = re.sub(r"<[^>]+>", " ", x)
-            return re.sub(r"\s+", " ", x).strip()
-
         targets: List[float] = []
         target_ages: List[int] = []
         recs: List[str] = []
@@ -589,42 +1048,44 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
         used_brokers = set()
         hk_reports: List[Dict] = []
 
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, re.S)
+        cutoff = today - timedelta(days=31)
+        rows = _TR_CAP_RE.findall(html)
         for tr in rows:
             if "class=\"text_l\"" not in tr or "/analysis/downpdf?report_idx=" not in tr:
                 continue
 
-            m_date = re.search(r'class="first txt_number">\s*(\d{4}-\d{2}-\d{2})\s*</td>', tr)
+            m_date = _CONS_DATE_RE.search(tr)
             if not m_date:
                 continue
             try:
                 d = datetime.strptime(m_date.group(1), "%Y-%m-%d").date()
             except Exception:
                 continue
-            if d < (today - timedelta(days=31)):
+            if d < cutoff:
                 continue
             age_days = max(0, (today - d).days)
 
-            m_title = re.search(r'class="text_l">[\s\S]*?<a [^>]*>(.*?)</a>', tr)
+            m_title = _CONS_TITLE_RE.search(tr)
             title = _txt(m_title.group(1)) if m_title else ""
             if stock_name not in title and code_match.group(1) not in title:
                 continue
 
-            m_idx = re.search(r'/analysis/downpdf\?report_idx=(\d+)', tr)
-
-            tds = re.findall(r"<td[^>]*>(.*?)</td>", tr, re.S)
+            tds = _TD_RE.findall(tr)
             cols = [_txt(td) for td in tds]
             broker = cols[5] if len(cols) >= 6 else (cols[4] if len(cols) >= 5 else None)
             if broker and broker in used_brokers:
                 continue
 
+            # 중복 증권사로 걸러질 행에서는 아래 추출 작업이 전부 낭비라
+            # report_idx 탐색과 본문 평문화를 dedup 통과 뒤로 미룬다
+            m_idx = _CONS_RIDX_RE.search(tr)
             detail_text = _txt(tr)
 
             # 목록 표의 목표주가 컬럼 우선 사용 (예: 1,550,000)
             row_target = None
             target_added_for_row = False
             if len(cols) >= 3:
-                m_col_tp = re.search(r"([0-9][0-9,]{3,})", cols[2] or "")
+                m_col_tp = _PRICE_NUM_RE.search(cols[2] or "")
                 if m_col_tp:
                     try:
                         row_target = float(m_col_tp.group(1).replace(",", ""))
@@ -637,9 +1098,9 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
 
             # 컬럼이 비어 있으면 텍스트에서 목표가 추출
             m_tp = None if row_target else (
-                re.search(r"목표\s*주가\s*[:：]?\s*([0-9][0-9,]{3,})\s*원", detail_text, re.I)
-                or re.search(r"적정\s*주가\s*[:：]?\s*([0-9][0-9,]{3,})\s*원", detail_text, re.I)
-                or re.search(r"\bTP\s*[:=]?\s*([0-9][0-9,]{3,})\b", detail_text, re.I)
+                _TP_RES[0].search(detail_text)
+                or _TP_RES[1].search(detail_text)
+                or _TP_RES[2].search(detail_text)
             )
             if m_tp:
                 try:
@@ -650,8 +1111,9 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
                     pass
 
             rec_text = ""
-            for kw in ["매수", "중립", "보유", "매도", "BUY", "HOLD", "SELL", "Outperform", "Underperform", "Neutral"]:
-                if re.search(re.escape(kw), detail_text, re.I):
+            detail_lower = detail_text.lower()
+            for kw, kw_l in _REC_KEYWORDS:
+                if kw_l in detail_lower:
                     rec_text = kw
                     break
 
@@ -721,9 +1183,10 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
         target = None
         if targets and target_ages:
             n_pair = min(len(targets), len(target_ages))
-            t = np.array(targets[:n_pair], dtype=float)
-            ages = np.array(target_ages[:n_pair], dtype=float)
-            w = np.array([np.exp(-float(a) / 21.0) for a in ages], dtype=float)
+            t = np.asarray(targets[:n_pair], dtype=np.float64)
+            ages = np.asarray(target_ages[:n_pair], dtype=np.float64)
+            # 파이썬 루프의 원소별 exp 대신 벡터화 exp 1회
+            w = np.exp(-ages / 21.0)
             if len(t) >= 5:
                 idx = np.argsort(t)
                 keep = idx[1:-1]
@@ -735,7 +1198,7 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
         target_fallback = False
         if target is None:
             try:
-                yfi = yf.Ticker(symbol).info or {}
+                yfi = _ticker_info(symbol)
                 y_target = yfi.get("targetMeanPrice")
                 if isinstance(y_target, (int, float)) and float(y_target) > 0:
                     target = float(y_target)
@@ -748,9 +1211,9 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
         rec_scores = [x for x in (_recommendation_to_score(r) for r in recs) if isinstance(x, (int, float))]
         mean = float(np.mean(rec_scores)) if rec_scores else None
 
-        w_rec = np.array([np.exp(-float(a) / 21.0) for a in rec_ages], dtype=float) if rec_ages else np.array([], dtype=float)
+        w_rec = np.exp(-np.asarray(rec_ages, dtype=np.float64) / 21.0) if rec_ages else np.array([], dtype=np.float64)
         if len(rec_scores) == len(rec_ages) and len(rec_scores) > 0 and w_rec.sum() > 0:
-            mean_w = float(np.average(np.array(rec_scores, dtype=float), weights=w_rec))
+            mean_w = float(np.average(np.asarray(rec_scores, dtype=np.float64), weights=w_rec))
         else:
             mean_w = mean
 
@@ -760,7 +1223,8 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
             k = _recommendation_bucket(r)
             if k:
                 b[k] += 1
-                wi = float(np.exp(-float(rec_ages[i]) / 21.0)) if i < len(rec_ages) else 1.0
+                # 위에서 벡터로 계산해 둔 가중치를 재사용 (원소별 exp 재계산 금지)
+                wi = float(w_rec[i]) if i < len(w_rec) else 1.0
                 b_w[k] += wi
         total_op = max(1, sum(b.values()))
         buy_ratio = b["buy"] / total_op
@@ -807,7 +1271,7 @@ def _consensus_from_naver_or_hk(symbol: str, name: str | None = None) -> Dict:
 
 def _consensus_from_yfinance(symbol: str) -> Dict:
     try:
-        info = yf.Ticker(symbol).info or {}
+        info = _ticker_info(symbol)
         cur = info.get("currentPrice")
         target = info.get("targetMeanPrice")
         mean = info.get("recommendationMean")
@@ -869,12 +1333,47 @@ def _consensus(symbol: str, name: str | None = None) -> Dict:
     if cached and (now - cached.get("ts", 0) < _CONS_TTL_SEC):
         return cached["data"]
 
-    is_kr = bool(re.match(r"^(\d{6})\.(KS|KQ)$", symbol or ""))
+    # 재시작/캐시 클리어 직후엔 디스크 계층이 받아준다 (TTL은 메모리와 동일)
+    disk = _disk_cache_get("consensus", symbol, _CONS_TTL_SEC)
+    if disk is not None:
+        with _CACHE_WRITE_LOCK:
+            _CONS_CACHE[symbol] = {"ts": now, "data": disk}
+        return disk
+
+    is_kr = bool(_KR_SYMBOL_RE.match(symbol or ""))
     data = _consensus_from_naver_or_hk(symbol, name=name) if is_kr else _consensus_from_yfinance(symbol)
-    _CONS_CACHE[symbol] = {"ts": now, "data": data}
+    with _CACHE_WRITE_LOCK:
+        _CONS_CACHE[symbol] = {"ts": now, "data": data}
+    _disk_cache_put("consensus", symbol, data)
     return data
 
 
+def _parse_theme_detail_fast(detail: str) -> tuple | None:
+    """selectolax가 설치돼 있으면 테마 상세 페이지를 C 파서로 추출한다.
+
+    반환은 (테마명, [(종목코드, 이름), ...]) 튜플. 파서가 없거나 실패하면
+    None을 돌려주고 호출부의 정규식 경로가 그대로 동작한다. 속성 순서가
+    바뀐 마크업도 CSS 셀렉터라서 정규식보다 안전하게 잡아낸다.
+    """
+    if _HTMLParser is None:
+        return None
+    try:
+        tree = _HTMLParser(detail)
+        title = tree.css_first("strong.info_title") or tree.css_first("h3.sub_tlt")
+        theme_name = (title.text(strip=True) or "").strip() if title is not None else None
+        stocks: List[tuple] = []
+        for a in tree.css('a[href*="item/main.naver?code="]'):
+            m = _KR_ROW_CODE_RE.search(a.attributes.get("href") or "")
+            if not m:
+                continue
+            nm = (a.text(strip=True) or "").strip()
+            if nm:
+                stocks.append((m.group(1), nm))
+        return (theme_name, stocks)
+    except Exception:
+        return None
+
+
 def _load_naver_theme_map() -> Dict[str, Dict]:
     now = time.time()
     cached = _NAVER_THEME_CACHE.get("map", {}) or {}
@@ -894,8 +1393,8 @@ def _load_naver_theme_map() -> Dict[str, Dict]:
             html = _fetch(f"https://finance.naver.com/sise/theme.naver?&page={p}")
 
             # 과거/현재 URL 형태 모두 허용
-            links = re.findall(r'href="(/sise/sise_group_detail\.naver\?type=theme&no=\d+)"', html)
-            links += re.findall(r'href="(/sise/theme_detail\.naver\?no=\d+)"', html)
+            links = _THEME_LINK_RE.findall(html)
+            links += _THEME_LINK_OLD_RE.findall(html)
 
             if not links:
                 continue
@@ -904,25 +1403,42 @@ def _load_naver_theme_map() -> Dict[str, Dict]:
                     theme_links.append(lk)
 
         # each theme detail -> stock code mapping
-        for rel in theme_links[:500]:
+        # 상세 페이지 수백 건을 순차 요청하면 RTT 합산으로 수 분이 걸리므로
+        # 스레드풀로 병렬 수집하고, 결과 병합은 링크 순서대로 해서 기존의
+        # "먼저 나온 테마 우선" 규칙을 유지한다.
+        def _fetch_detail(rel: str) -> str | None:
             try:
-                detail = _fetch("https://finance.naver.com" + rel)
+                return _fetch("https://finance.naver.com" + rel)
+            except Exception:
+                return None
 
-                # 상세 제목 우선, 없으면 sub title fallback
-                m_theme = (
-                    re.search(r'<strong class="info_title">\s*([^<]+?)\s*</strong>', detail)
-                    or re.search(r'<h3 class="sub_tlt">\s*([^<]+?)\s*</h3>', detail)
-                )
-                theme_name = _strip_tags(m_theme.group(1)).strip() if m_theme else None
+        links = theme_links[:500]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as ex:
+            details = list(ex.map(_fetch_detail, links))
+
+        for detail in details:
+            if not detail:
+                continue
+            try:
+                fast = _parse_theme_detail_fast(detail)
+                if fast is not None:
+                    theme_name, stocks = fast
+                else:
+                    # 상세 제목 우선, 없으면 sub title fallback
+                    # 제목 블록은 문서 상단에 있으므로 앞쪽 20KB만 검색
+                    head = detail[:20000]
+                    m_theme = _THEME_TITLE_RE.search(head) or _THEME_SUBTITLE_RE.search(head)
+                    theme_name = _strip_tags(m_theme.group(1)).strip() if m_theme else None
+                    stocks = [(code, _strip_tags(nm).strip()) for code, nm in _THEME_STOCK_RE.findall(detail)]
                 if not theme_name:
                     continue
 
-                for code, nm in re.findall(r'item/main\.naver\?code=(\d{6})[^>]*>([^<]+)</a>', detail):
+                for code, nm in stocks:
                     code6 = code.strip()
                     if not code6:
                         continue
                     rec = out.get(code6)
-                    cand = {"theme": theme_name, "name": _strip_tags(nm).strip(), "source": "naver_theme"}
+                    cand = {"theme": theme_name, "name": nm, "source": "naver_theme"}
                     if rec is None:
                         out[code6] = cand
             except Exception:
@@ -940,10 +1456,16 @@ def _get_symbol_theme_meta(symbol: str) -> Dict:
     if sym in _THEME_META_CACHE:
         return _THEME_META_CACHE[sym]
 
+    disk = _disk_cache_get("theme_meta", sym, _THEME_META_DISK_TTL_SEC)
+    if disk is not None:
+        with _CACHE_WRITE_LOCK:
+            _THEME_META_CACHE[sym] = disk
+        return disk
+
     out = {"theme": "UNKNOWN", "sector": None, "industry": None, "source": "unknown"}
 
     # KR 종목은 네이버 증권 테마를 최우선 사용
-    m = re.match(r"^(\d{6})\.(KS|KQ)$", sym)
+    m = _KR_SYMBOL_RE.match(sym)
     if m:
         code6 = m.group(1)
         theme_map = _load_naver_theme_map()
@@ -955,12 +1477,14 @@ def _get_symbol_theme_meta(symbol: str) -> Dict:
                 "industry": None,
                 "source": "naver_theme",
             }
-            _THEME_META_CACHE[sym] = out
+            with _CACHE_WRITE_LOCK:
+                _THEME_META_CACHE[sym] = out
+            _disk_cache_put("theme_meta", sym, out)
             return out
 
     # non-KR fallback (기존 유지)
     try:
-        info = yf.Ticker(sym).info or {}
+        info = _ticker_info(sym)
         sector = (info.get("sector") or "").strip()
         industry = (info.get("industry") or "").strip()
         theme = f"{sector} > {industry}" if (sector and industry) else (sector or industry or "UNKNOWN")
@@ -968,7 +1492,11 @@ def _get_symbol_theme_meta(symbol: str) -> Dict:
     except Exception:
         pass
 
-    _THEME_META_CACHE[sym] = out
+    with _CACHE_WRITE_LOCK:
+        _THEME_META_CACHE[sym] = out
+    if out.get("source") != "unknown":
+        # 일시 실패로 UNKNOWN이 된 값을 7일간 못 박지 않도록 성공분만 영속화
+        _disk_cache_put("theme_meta", sym, out)
     return out
 
 
@@ -1245,18 +1773,50 @@ def _apply_runtime_theme_scores(rows: List[Dict], score_config: Dict[str, Any] |
     return rows
 
 
+_NEWS_CACHE: Dict[str, Dict] = {}
+_NEWS_TTL_SEC = 60 * 5
+_NEWS_LOCK = threading.Lock()
+_NEWS_INFLIGHT: Dict[str, threading.Event] = {}
+
+
 def _news(symbol: str, name: str, limit: int = 8) -> Dict:
+    """구글 뉴스 RSS 요약. 5분 TTL 캐시 + 동일 키 동시 요청은 1회로 합친다."""
+    key = f"{symbol}|{limit}"
+    while True:
+        with _NEWS_LOCK:
+            cached = _NEWS_CACHE.get(key)
+            if cached and (time.time() - cached.get("ts", 0) < _NEWS_TTL_SEC):
+                return cached["data"]
+            ev = _NEWS_INFLIGHT.get(key)
+            if ev is None:
+                ev = threading.Event()
+                _NEWS_INFLIGHT[key] = ev
+                break
+        # 다른 스레드가 같은 키를 받아오는 중이면 완료를 기다렸다 캐시를 재확인
+        ev.wait(timeout=15)
+
+    try:
+        data = _news_fetch(symbol, name, limit)
+    except Exception:
+        data = {"headlineCount": 0, "tone": 0, "score": 50.0, "headlines": [], "links": []}
+    with _NEWS_LOCK:
+        _NEWS_CACHE[key] = {"ts": time.time(), "data": data}
+        _NEWS_INFLIGHT.pop(key, None)
+        ev.set()
+    return data
+
+
+def _news_fetch(symbol: str, name: str, limit: int = 8) -> Dict:
     try:
         q = urllib.parse.quote(f"{symbol} {name} outlook")
         url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        xml = urllib.request.urlopen(req, timeout=10).read().decode("utf-8", "ignore")
-        items = re.findall(r"<item>(.*?)</item>", xml, re.S)
+        xml = _SESSION.get(url, timeout=10).content.decode("utf-8", "ignore")
+        items = _RSS_ITEM_RE.findall(xml)
         titles = []
         links = []
         for raw in items[:limit]:
-            t = re.search(r"<title><!\[CDATA\[(.*?)\]\]></title>", raw)
-            l = re.search(r"<link>(.*?)</link>", raw)
+            t = _RSS_TITLE_RE.search(raw)
+            l = _RSS_LINK_RE.search(raw)
             if t:
                 titles.append(t.group(1).strip())
             if l:
@@ -1264,9 +1824,7 @@ def _news(symbol: str, name: str, limit: int = 8) -> Dict:
 
         tone = 0
         for t in titles:
-            lo = t.lower()
-            tone += sum(1 for w in POSITIVE if w in lo)
-            tone -= sum(1 for w in NEGATIVE if w in lo)
+            tone += _headline_tone(t.lower())
 
         score = float(50 + tone * 6 + len(titles) * 1.2)
         return {
@@ -1280,13 +1838,15 @@ def _news(symbol: str, name: str, limit: int = 8) -> Dict:
         return {"headlineCount": 0, "tone": 0, "score": 50.0, "headlines": [], "links": []}
 
 
-def _momentum_score(s: pd.Series) -> Dict:
-    m1 = _pct(s, 21) * 100
-    m3 = _pct(s, 63) * 100
-    m6 = _pct(s, 126) * 100
-    ma20 = float(s.rolling(20).mean().iloc[-1])
-    ma60 = float(s.rolling(60).mean().iloc[-1])
-    cur = float(s.iloc[-1])
+def _momentum_score(arr: np.ndarray) -> Dict:
+    # 호출부가 변환해 둔 ndarray를 그대로 사용: rolling 전체 시리즈 대신 꼬리 윈도우 평균만 계산
+    n = arr.shape[0]
+    m1 = float(arr[-1] / arr[-22] - 1) * 100 if n > 21 else 0.0
+    m3 = float(arr[-1] / arr[-64] - 1) * 100 if n > 63 else 0.0
+    m6 = float(arr[-1] / arr[-127] - 1) * 100 if n > 126 else 0.0
+    ma20 = float(arr[-20:].mean())
+    ma60 = float(arr[-60:].mean())
+    cur = float(arr[-1])
     trend_boost = 10 if (cur > ma20 and ma20 > ma60) else (-8 if cur < ma20 else 0)
     raw = m1 * 0.35 + m3 * 0.4 + m6 * 0.25 + trend_boost
     score = float(50 + raw)
@@ -1309,9 +1869,10 @@ def _liquidity_score(symbol: str) -> float:
         return 50.0
 
 
-def _risk_score(s: pd.Series) -> Dict:
-    v = _vol(s) * 100
-    dd = abs(_mdd(s)) * 100
+def _risk_score(arr: np.ndarray) -> Dict:
+    vol, mdd = _vol_mdd_kernel(arr)
+    v = vol * 100
+    dd = abs(mdd) * 100
     # 단일주식 모드: 너무 낮은 변동성은 감점, 중간~중상 변동성 선호, 과열은 감점
     # vol sweet spot: 22%~45%
     if v < 22:
@@ -1326,22 +1887,18 @@ def _risk_score(s: pd.Series) -> Dict:
     return {"volPct": round(v, 2), "maxDrawdownPct": round(dd, 2), "score": round(score, 2)}
 
 
-def _technical_score(s: pd.Series, target_price: float | None = None) -> Dict:
+def _technical_score(arr: np.ndarray, target_price: float | None = None) -> Dict:
     """기술적 분석(사용자 요청): MA20/MA60/MA120 거리 기반 점수.
     - 세 이평선 모두 절대값 임계치 4% 사용
     - 과열 감점 없음
     - 추세 필터 없음
     """
-    close = s.astype(float)
-    cur = float(close.iloc[-1])
-
-    ma20_series = close.rolling(20).mean()
-    ma60_series = close.rolling(60).mean()
-    ma120_series = close.rolling(120).mean()
+    # 마지막 값만 쓰므로 전체 rolling 시리즈 3개를 만들 필요 없이 꼬리 평균으로 충분
+    cur = float(arr[-1])
 
-    ma20 = float(ma20_series.iloc[-1])
-    ma60 = float(ma60_series.iloc[-1])
-    ma120 = float(ma120_series.iloc[-1]) if len(close) >= 120 else ma60
+    ma20 = float(arr[-20:].mean())
+    ma60 = float(arr[-60:].mean())
+    ma120 = float(arr[-120:].mean()) if arr.shape[0] >= 120 else ma60
 
     dist_ma20 = (cur / ma20 - 1) * 100 if ma20 else 0.0
     dist_ma60 = (cur / ma60 - 1) * 100 if ma60 else 0.0
@@ -1388,8 +1945,19 @@ def _technical_score(s: pd.Series, target_price: float | None = None) -> Dict:
     }
 
 
-def evaluate_asset(asset: Asset) -> Dict | None:
-    s = _download_close(asset.symbol, "1y")
+@functools.lru_cache(maxsize=1024)
+def _asset_links(symbol: str) -> tuple:
+    # 심볼만으로 결정되는 순수 URL 빌더라 리포트마다 quote/포맷을 반복할 이유가 없다.
+    # lru_cache가 가변 dict를 공유하지 않도록 튜플로 캐시하고 호출부에서 dict로 푼다.
+    return (
+        ("yahoo", f"https://finance.yahoo.com/quote/{symbol}"),
+        ("analysis", f"https://finance.yahoo.com/quote/{symbol}/analysis/"),
+        ("news", f"https://news.google.com/search?q={urllib.parse.quote(symbol)}"),
+    )
+
+
+def evaluate_asset(asset: Asset, close: pd.Series | None = None) -> Dict | None:
+    s = close if close is not None else _download_close(asset.symbol, "1y")
     if s is None:
         return None
 
@@ -1399,11 +1967,14 @@ def evaluate_asset(asset: Asset) -> Dict | None:
     if report_consensus.get("targetMeanPrice") is None:
         return None
 
-    momentum = _momentum_score(s)
+    # 점수 함수마다 Series→ndarray 변환을 반복하지 않게 여기서 1회 변환해 공유
+    arr = _to_arr(s)
+
+    momentum = _momentum_score(arr)
     crowd = _news(asset.symbol, asset.name)
     liquidity = _liquidity_score(asset.symbol)
-    risk = _risk_score(s)
-    technical = _technical_score(s, target_price=report_consensus.get("targetMeanPrice"))
+    risk = _risk_score(arr)
+    technical = _technical_score(arr, target_price=report_consensus.get("targetMeanPrice"))
 
     # 종목 자체 점수(요청): 리서치/컨센서스 점수를 종목 점수로 사용
     base_score = float(report_consensus["score"])
@@ -1422,11 +1993,19 @@ def evaluate_asset(asset: Asset) -> Dict | None:
 
     score = 0.9 * base_score + 0.1 * confidence
 
-    cur = float(s.iloc[-1])
-    atrp = float(s.pct_change().abs().tail(14).mean()) if len(s) > 20 else 0.03
+    # 플랜 산출 입력(현재가/ATR 근사/3·6개월 수익률)도 같은 ndarray로 계산
+    n = arr.shape[0]
+    cur = float(arr[-1])
+    if n > 20:
+        tail = arr[-15:]
+        atrp = float(np.abs(tail[1:] / tail[:-1] - 1.0).mean())
+    else:
+        atrp = 0.03
+    r63 = float(arr[-1] / arr[-64] - 1) if n > 63 else 0.0
+    r126 = float(arr[-1] / arr[-127] - 1) if n > 126 else 0.0
     stop = cur * (1 - max(0.04, min(0.14, atrp * 1.8)))
-    tp1 = cur * (1 + max(0.06, min(0.22, (_pct(s, 63) * 0.6 + 0.06))))
-    tp2 = cur * (1 + max(0.1, min(0.35, (_pct(s, 126) * 0.8 + 0.12))))
+    tp1 = cur * (1 + max(0.06, min(0.22, (r63 * 0.6 + 0.06))))
+    tp2 = cur * (1 + max(0.1, min(0.35, (r126 * 0.8 + 0.12))))
 
     invalidation = "종가가 20일선 하회 + 거래강도 둔화가 2거래일 연속이면 추천 무효"
 
@@ -1437,7 +2016,7 @@ def evaluate_asset(asset: Asset) -> Dict | None:
 
     company_info = {"summary": None, "sector": None, "industry": None, "website": None}
     try:
-        info = yf.Ticker(asset.symbol).info or {}
+        info = _ticker_info(asset.symbol)
         company_info = {
             "summary": (info.get("longBusinessSummary") or "")[:700] or None,
             "sector": info.get("sector"),
@@ -1476,11 +2055,7 @@ def evaluate_asset(asset: Asset) -> Dict | None:
             "ttlTradingDays": 3,
             "invalidationRule": invalidation,
         },
-        "links": {
-            "yahoo": f"https://finance.yahoo.com/quote/{asset.symbol}",
-            "analysis": f"https://finance.yahoo.com/quote/{asset.symbol}/analysis/",
-            "news": f"https://news.google.com/search?q={urllib.parse.quote(asset.symbol)}",
-        },
+        "links": dict(_asset_links(asset.symbol)),
     }
 
 
@@ -1510,20 +2085,41 @@ def build_report(market: str = "all", candidate_limit: int | None = None, progre
     if isinstance(candidate_limit, int) and candidate_limit > 0:
         assets = assets[:candidate_limit]
 
+    # 종가는 배치 다운로드 1회로 선수집, 누락 종목만 evaluate_asset 내부에서 개별 재시도
+    close_map = _download_close_batch([a.symbol for a in assets])
+
+    # .info도 미리 일괄 수집해 두면 평가 워커들은 전부 캐시 히트로 처리된다
+    _prefetch_infos([a.symbol for a in assets])
+
     total_assets = len(assets)
-    for i, a in enumerate(assets, start=1):
-        r = evaluate_asset(a)
+
+    # 종목당 평가는 컨센서스/뉴스/yfinance 등 I/O 대기가 대부분이라
+    # 스레드풀 fan-out으로 돌린다. 진행률 콜백은 완료 순서대로 쏘고,
+    # rows/failed는 제출 순서 기준으로 재조립해 결과를 결정적으로 유지한다.
+    results: Dict[str, Dict | None] = {}
+    done_n = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=12) as ex:
+        futs = {ex.submit(evaluate_asset, a, close_map.get(a.symbol)): a for a in assets}
+        for fut in concurrent.futures.as_completed(futs):
+            a = futs[fut]
+            try:
+                results[a.symbol] = fut.result()
+            except Exception:
+                results[a.symbol] = None
+            done_n += 1
+            if callable(progress_cb):
+                try:
+                    progress_cb(done=done_n, total=total_assets, symbol=a.symbol)
+                except Exception:
+                    pass
+
+    for a in assets:
+        r = results.get(a.symbol)
         if r is None:
             failed.append(a.symbol)
         else:
             rows.append(r)
 
-        if callable(progress_cb):
-            try:
-                progress_cb(done=i, total=total_assets, symbol=a.symbol)
-            except Exception:
-                pass
-
     # 사용자 요청: ETF 제외 (단일 주식만 허용)
     rows = [r for r in rows if not _is_etf_like(r)]
 
@@ -1571,7 +2167,7 @@ def build_report(market: str = "all", candidate_limit: int | None = None, progre
     market_label = {"all": "KR+US", "kr": "KR", "us": "US"}.get(mk, "KR+US")
 
     report = {
-        "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "generatedAt": _utc_now_z(),
         "model": f"{market_label} Single-Stock Dual Ranking v5 (No Momentum + Technical)",
         "market": mk,
         "candidateLimit": total_assets,
@@ -1607,7 +2203,7 @@ def _append_log(report: Dict):
     }
     state.append(item)
     state = state[-200:]
-    STATE_PATH.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    STATE_PATH.write_bytes(_dump_json_bytes(state))
     # NOTE:
     # 아카이브는 사용자가 명시적으로 "아카이브 저장" 버튼을 눌렀을 때만 저장한다.
     # 과거에는 리포트 생성 시 topPick을 자동 저장했는데,
@@ -1666,7 +2262,7 @@ def save_daily_snapshot(force: bool = False) -> Dict:
         "highReturnTop5": (report.get("highReturnRankings") or [])[:5],
         "failed": report.get("failed", []),
     }
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_bytes(_dump_json_bytes(payload))
     return {"saved": True, "path": str(path), "date": day, "generatedAt": payload.get("generatedAt")}
 
 
@@ -1690,7 +2286,7 @@ def list_snapshots(limit: int = 60) -> List[Dict]:
 
 def get_snapshot(date_kst: str) -> Dict | None:
     SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", date_kst or ""):
+    if not _DATE_YMD_RE.match(date_kst or ""):
         return None
     p = SNAPSHOT_DIR / f"{date_kst}.json"
     if not p.exists():
@@ -1704,7 +2300,7 @@ def get_snapshot(date_kst: str) -> Dict | None:
 def list_snapshot_dates_by_month(ym: str) -> List[str]:
     """Return available snapshot dates for YYYY-MM."""
     SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
-    if not re.match(r"^\d{4}-\d{2}$", ym or ""):
+    if not _MONTH_YM_RE.match(ym or ""):
         return []
     files = sorted(SNAPSHOT_DIR.glob(f"{ym}-*.json"))
     return [p.stem for p in files]
@@ -1779,6 +2375,6 @@ def get_current_change_vs_snapshot(date_kst: str) -> Dict:
 
     return {
         "dateKST": date_kst,
-        "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "generatedAt": _utc_now_z(),
         "items": items,
     }
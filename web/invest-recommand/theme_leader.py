@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import re
 import json
 from pathlib import Path
@@ -27,14 +28,14 @@ def _to_float(v: Any) -> float:
     return float(m.group(0)) if m else 0.0
 
 
-def _norm(arr: List[float]) -> List[float]:
-    if not arr:
-        return []
-    a = np.array(arr, dtype=float)
-    lo, hi = float(np.min(a)), float(np.max(a))
+def _norm(arr: List[float]) -> np.ndarray:
+    a = np.asarray(arr, dtype=float)
+    if a.size == 0:
+        return a
+    lo, hi = float(a.min()), float(a.max())
     if hi - lo < 1e-9:
-        return [50.0 for _ in arr]
-    return [float((x - lo) / (hi - lo) * 100) for x in a]
+        return np.full(a.shape, 50.0)
+    return (a - lo) / (hi - lo) * 100.0
 
 
 def _download_close(code: str) -> pd.Series | None:
@@ -65,9 +66,15 @@ def _estimate_plan(row: Dict[str, Any]) -> Dict[str, Any]:
 
     s = _download_close(str(row.get("code") or ""))
     if s is not None and len(s) >= 30:
-        cur = float(s.iloc[-1])
-        atrp = float(s.pct_change().abs().tail(14).mean()) if len(s) >= 20 else 0.03
-        m1 = float(s.iloc[-1] / s.iloc[-21] - 1) if len(s) >= 22 else 0.0
+        # pct_change 체인 대신 ndarray diff로 중간 Series 할당 없이 계산
+        arr = s.to_numpy(dtype=float)
+        cur = float(arr[-1])
+        if arr.shape[0] >= 20:
+            tail = arr[-15:]
+            atrp = float(np.abs(np.diff(tail) / tail[:-1]).mean())
+        else:
+            atrp = 0.03
+        m1 = float(arr[-1] / arr[-21] - 1) if arr.shape[0] >= 22 else 0.0
 
         loss_pct = -max(0.035, min(0.12, atrp * 1.8)) * 100
         ret_pct = max(6.0, min(24.0, (0.08 + max(-0.02, m1 * 0.6)) * 100))
@@ -135,17 +142,19 @@ def build_theme_leader_report(limit_themes: int = 12, per_theme_pick: int = 2) -
 
     if not all_rows:
         return {
-            "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            "generatedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
             "date": data.get("date"),
             "themes": [],
             "leaders": [],
         }
 
+    # 사용자 요청: 리더점수에서 거래량 제외 + 거래대금 비중 강화(75:25)
+    # 정규화/가중합은 파이썬 루프 대신 ndarray 연산으로 한 번에 계산
     chg_n = _norm([x["changeRatePct"] for x in all_rows])
     tv_n = _norm([x["tradeValue"] for x in all_rows])
-    for i, row in enumerate(all_rows):
-        # 사용자 요청: 리더점수에서 거래량 제외 + 거래대금 비중 강화(75:25)
-        row["leadershipScore"] = round(0.25 * chg_n[i] + 0.75 * tv_n[i], 2)
+    scores = np.round(0.25 * chg_n + 0.75 * tv_n, 2)
+    for row, sc in zip(all_rows, scores):
+        row["leadershipScore"] = float(sc)
 
     # per-theme leaders
     by_theme: Dict[str, List[Dict[str, Any]]] = {}
@@ -160,8 +169,8 @@ def build_theme_leader_report(limit_themes: int = 12, per_theme_pick: int = 2) -
         rows = by_theme.get(title, [])
         if not rows:
             continue
-        rows.sort(key=lambda x: x["leadershipScore"], reverse=True)
-        leaders = rows[: max(1, per_theme_pick)]
+        # 상위 per_theme_pick개만 쓰므로 전체 정렬 대신 부분 선택
+        leaders = heapq.nlargest(max(1, per_theme_pick), rows, key=lambda x: x["leadershipScore"])
 
         pos_cnt = sum(1 for x in rows if x["changeRatePct"] > 0)
         breadth = (pos_cnt / len(rows)) * 100.0 if rows else 0.0
@@ -179,7 +188,7 @@ def build_theme_leader_report(limit_themes: int = 12, per_theme_pick: int = 2) -
         all_leaders.extend(leaders)
 
     theme_cards.sort(key=lambda x: x["themeScore"], reverse=True)
-    all_leaders.sort(key=lambda x: x["leadershipScore"], reverse=True)
+    top_leaders = heapq.nlargest(20, all_leaders, key=lambda x: x["leadershipScore"])
 
     # 주도주 매수 가정(당일 기준) 기대수익/손절률 추정
     plan_cache: Dict[str, Dict[str, Any]] = {}
@@ -190,11 +199,11 @@ def build_theme_leader_report(limit_themes: int = 12, per_theme_pick: int = 2) -
         row["plan"] = plan_cache[code]
 
     return {
-        "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "generatedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "date": data.get("date"),
         "methodology": "ThemeScore = 0.75*LeaderScore(avg top picks) + 0.25*Breadth; LeaderScore = 0.25*Change + 0.75*TradeValue (cross-theme normalized)",
         "themes": theme_cards,
-        "leaders": all_leaders[:20],
+        "leaders": top_leaders,
     }
 
 
@@ -210,7 +219,7 @@ def save_theme_leader_snapshot(force: bool = False, limit_themes: int = 12, per_
 
     payload = {
         "date": day,
-        "savedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "savedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "generatedAt": report.get("generatedAt"),
         "methodology": report.get("methodology"),
         "topThemes": (report.get("themes") or [])[:10],
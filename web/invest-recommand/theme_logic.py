@@ -52,20 +52,25 @@ def _get_close_map(tickers: List[str], period: str = "9mo") -> Dict[str, pd.Seri
 
 
 def _score(s: pd.Series) -> Dict:
-    cur = float(s.iloc[-1])
-    r1 = float(s.iloc[-1] / s.iloc[-21] - 1) * 100 if len(s) > 21 else 0.0
-    r3 = float(s.iloc[-1] / s.iloc[-63] - 1) * 100 if len(s) > 63 else 0.0
-    r6 = float(s.iloc[-1] / s.iloc[-126] - 1) * 100 if len(s) > 126 else 0.0
-
-    ma20 = float(s.rolling(20).mean().iloc[-1])
-    ma60 = float(s.rolling(60).mean().iloc[-1])
+    # Series 인덱싱/rolling 대신 ndarray 한 번 변환으로 전 지표 계산
+    arr = s.to_numpy(dtype=float)
+    n = arr.shape[0]
+    cur = float(arr[-1])
+    r1 = float(arr[-1] / arr[-21] - 1) * 100 if n > 21 else 0.0
+    r3 = float(arr[-1] / arr[-63] - 1) * 100 if n > 63 else 0.0
+    r6 = float(arr[-1] / arr[-126] - 1) * 100 if n > 126 else 0.0
+
+    ma20 = float(arr[-20:].mean())
+    ma60 = float(arr[-60:].mean())
     trend = 12 if cur > ma20 > ma60 else (2 if cur > ma20 else -10)
 
-    vol = float(s.pct_change().dropna().std() * np.sqrt(252) * 100)
+    rets = np.diff(arr) / arr[:-1]
+    vol = float(rets.std(ddof=1) * np.sqrt(252) * 100)
     vol_penalty = max(0.0, vol - 42) * 0.9
 
     raw = (r1 * 0.35) + (r3 * 0.4) + (r6 * 0.25) + trend - vol_penalty
-    score = float(np.clip(50 + raw, 0, 100))
+    # 스칼라 하나에 np.clip을 쓰면 0-d 배열 생성 비용만 드므로 순수 파이썬으로 클램프
+    score = max(0.0, min(100.0, 50.0 + raw))
 
     return {
         "score": round(score, 2),
@@ -119,7 +124,7 @@ def build_theme_report() -> Dict:
             })
 
     return {
-        "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "generatedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "method": "9개월 가격데이터 기반 모멘텀(1/3/6개월)+추세+변동성 패널티",
         "themes": themes_out,
         "topPicks": sorted(top_picks, key=lambda x: x["score"], reverse=True)[:6],
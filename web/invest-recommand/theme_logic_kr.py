@@ -62,21 +62,25 @@ def _download_close_map(symbols: List[str], period: str = "10mo") -> Dict[str, p
 
 
 def _calc_score(close: pd.Series) -> Dict:
-    cur = float(close.iloc[-1])
-    m1 = float(close.iloc[-1] / close.iloc[-21] - 1) * 100 if len(close) > 21 else 0.0
-    m3 = float(close.iloc[-1] / close.iloc[-63] - 1) * 100 if len(close) > 63 else 0.0
-    m6 = float(close.iloc[-1] / close.iloc[-126] - 1) * 100 if len(close) > 126 else 0.0
-
-    ma20 = float(close.rolling(20).mean().iloc[-1])
-    ma60 = float(close.rolling(60).mean().iloc[-1])
+    # Series 인덱싱/rolling 대신 ndarray 한 번 변환으로 전 지표 계산
+    arr = close.to_numpy(dtype=float)
+    n = arr.shape[0]
+    cur = float(arr[-1])
+    m1 = float(arr[-1] / arr[-21] - 1) * 100 if n > 21 else 0.0
+    m3 = float(arr[-1] / arr[-63] - 1) * 100 if n > 63 else 0.0
+    m6 = float(arr[-1] / arr[-126] - 1) * 100 if n > 126 else 0.0
+
+    ma20 = float(arr[-20:].mean())
+    ma60 = float(arr[-60:].mean())
     trend = 12 if cur > ma20 > ma60 else (2 if cur > ma20 else -10)
 
-    ret = close.pct_change().dropna()
-    vol = float(ret.std() * np.sqrt(252) * 100) if len(ret) > 20 else 0.0
+    rets = np.diff(arr) / arr[:-1]
+    vol = float(rets.std(ddof=1) * np.sqrt(252) * 100) if rets.shape[0] > 20 else 0.0
     vol_penalty = max(0.0, vol - 45) * 0.8
 
     raw = (m1 * 0.35) + (m3 * 0.40) + (m6 * 0.25) + trend - vol_penalty
-    score = float(np.clip(50 + raw, 0, 100))
+    # 스칼라 하나에 np.clip을 쓰면 0-d 배열 생성 비용만 드므로 순수 파이썬으로 클램프
+    score = max(0.0, min(100.0, 50.0 + raw))
 
     return {
         "score": round(score, 2),
@@ -125,7 +129,7 @@ def build_kr_theme_report() -> Dict:
     picks.sort(key=lambda x: x["score"], reverse=True)
 
     return {
-        "generatedAt": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "generatedAt": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "market": "KR",
         "method": "KR 종목 1/3/6개월 모멘텀 + 추세 + 변동성 패널티",
         "themes": themes,